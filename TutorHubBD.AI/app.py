@@ -1,38 +1,427 @@
-from flask import Flask, jsonify, request
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, request
 from flask_cors import CORS
+from werkzeug.serving import WSGIRequestHandler
+
+import autocomplete
+import fuzzy
+import wire
+from dedup import THRESHOLD, find_duplicate_groups
+from extraction import proxy_from_env
+from offer_index import OfferIndex
+from querylog import QueryLog, normalize_query, normalize_text, prewarm
+from ranking import RANKERS
+from salary import SalaryIndex, offer_cell, query_cell
+from schedule import parse_schedule
+from tutor_index import TutorIndex
+from wire import respond
 
 app = Flask(__name__)
 CORS(app)  # Enable Cross-Origin Resource Sharing so ASP.NET can call this
 
+# Shared, persistent cache + micro-batcher in front of the LLM
+extraction_proxy = proxy_from_env()
+
+# Typo-tolerant vocabulary index, persisted so restarts don't rebuild it
+DATA_DIR = os.environ.get("AI_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+FUZZY_INDEX_PATH = os.path.join(DATA_DIR, "symspell.pkl")
+tutor_names = fuzzy.persisted_tutor_names(FUZZY_INDEX_PATH)
+fuzzy_index = fuzzy.build_index(tutor_names, FUZZY_INDEX_PATH)
+
+# Tutors pushed by the web app (/index/tutors); empty until the first push
+tutor_index = TutorIndex([])
+
+# /recommend query log + popular-query sketch; the top queries are replayed
+# against every pushed tutor index, and /ready reports 503 while that runs.
+# The empty index the service starts with has nothing to warm, so a fresh
+# service is ready straight away.
+QUERY_LOG_PATH = os.environ.get("QUERY_LOG_PATH", os.path.join(DATA_DIR, "recommend-queries.log"))
+PREWARM_TOP_N = int(os.environ.get("PREWARM_TOP_N", 200))
+query_log = QueryLog(QUERY_LOG_PATH, max_bytes=int(os.environ.get("QUERY_LOG_MAX_BYTES", 5 * 1024 * 1024)))
+ready = threading.Event()
+ready.set()
+_ready_lock = threading.Lock()
+_warm_pool = ThreadPoolExecutor(max_workers=1)
+
+def _warm(index):
+    queries = [query for query, _, _ in query_log.top(PREWARM_TOP_N)]
+    try:
+        warmed = prewarm(index, queries)
+        app.logger.info("Pre-warmed tutor index with %d queries", warmed)
+    except Exception:
+        # A cold index still answers correctly; don't hold readiness back for it
+        app.logger.exception("Pre-warming the tutor index failed")
+    with _ready_lock:
+        # A newer index may have been swapped in meanwhile; its own job will flip the flag
+        if index is tutor_index:
+            ready.set()
+
+def _swap_tutor_index(index):
+    global tutor_index
+    warm = len(index) > 0 and len(query_log.popular) > 0
+    with _ready_lock:
+        tutor_index = index
+        if warm:
+            ready.clear()
+        else:
+            ready.set()
+    if warm:
+        _warm_pool.submit(_warm, index)
+
+# Salary quantile sketches per subject x class x area x medium (/index/offers, /offers),
+# saved after every update so a restart doesn't lose the market rates
+SALARY_INDEX_PATH = os.path.join(DATA_DIR, "salary.pkl")
+salary_index = SalaryIndex.load(SALARY_INDEX_PATH) or SalaryIndex()
+
+def _save_salaries():
+    try:
+        salary_index.save(SALARY_INDEX_PATH)
+    except OSError as ex:
+        # The in-memory sketches are still current; only a restart would lose them
+        app.logger.warning("Could not save salary sketches: %s", ex)
+
+# Open offers for /recommend/jobs, with near-duplicate clusters (/index/offers, /offers)
+offer_index = OfferIndex()
+
+# Typeahead over the vocabularies and verified tutor names, weighted by how
+# often the pushed tutors and offers use each term
+def _rebuild_autocomplete():
+    global autocomplete_index
+    tutors = list(tutor_index.tutors.values()) or [{"FullName": n, "IsVerified": True} for n in tutor_names]
+    autocomplete_index = autocomplete.build_index(tutors, list(offer_index.offers.values()))
+
+_rebuild_autocomplete()
+
+# Wire contract: schema version check on every request, errors in the caller's format
+@app.before_request
+def check_schema_version():
+    wire.check_schema_version()
+
+@app.errorhandler(wire.WireError)
+def handle_wire_error(ex):
+    return wire.error(str(ex), ex.status)
+
 # SRS 3.1.4 AI-Powered Recommendations
 # Endpoint to check if the AI service is running
 @app.route('/status', methods=['GET'])
 def status():
-    return jsonify({
+    return respond({
         "status": "online",
         "service": "TutorHubBD AI Engine",
-        "version": "1.0"
+        "version": "1.0",
+        "schema_version": wire.SCHEMA_VERSION,
+        "formats": [f for f, ok in ((wire.JSON, True), (wire.MSGPACK, wire.msgpack), (wire.ARROW, wire.pyarrow)) if ok],
+        "encodings": ["gzip"] + (["zstd"] if wire.zstandard else []),
+        "ready": ready.is_set(),
+    })
+
+# Readiness probe: 503 only while a newly pushed tutor index is being pre-warmed
+@app.route('/ready', methods=['GET'])
+def readiness():
+    if not ready.is_set():
+        return respond({"ready": False, "tutors": len(tutor_index)}, 503)
+    return respond({"ready": True, "tutors": len(tutor_index)})
+
+def _body_list(data, field):
+    items = data.get(field, [])
+    if not isinstance(items, list):
+        raise wire.WireError(f"{field} must be a list")
+    return items
+
+def _body_prompt(data):
+    prompt = data.get('prompt', '')
+    if not isinstance(prompt, str):
+        raise wire.WireError("prompt must be a string")
+    return prompt
+
+_NUMERIC_CRITERIA = ("MinSalary", "MaxSalary")
+
+def _body_criteria(data):
+    """The caller's criteria (e.g. from /extract), or None to parse the prompt.
+    Values are matched as substrings, so each must be a single string."""
+    criteria = data.get('criteria')
+    if not isinstance(criteria, dict):
+        return None
+    for field, value in criteria.items():
+        if value is None:
+            continue
+        if field == "Keywords":
+            ok = isinstance(value, list) and all(isinstance(k, str) for k in value)
+            expected = "a list of strings"
+        elif field in _NUMERIC_CRITERIA:
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+            expected = "a number"
+        else:
+            ok = isinstance(value, str)
+            expected = "a string"
+        if not ok:
+            raise wire.WireError(f"criteria.{field} must be {expected}")
+    return criteria
+
+# SRS FR-16 & FR-17: Criteria extraction proxy
+# Body: {"prompt": "...", "mode": "tutor" | "job"}
+# Returns the same JSON fields the web app used to get from Gemini directly.
+@app.route('/extract', methods=['POST'])
+def extract_criteria():
+    data = wire.read_body()
+    prompt = _body_prompt(data)
+    mode = data.get('mode', 'tutor')
+
+    if not prompt.strip():
+        return wire.error("prompt is required", 400)
+    if mode not in ('tutor', 'job'):
+        return wire.error("mode must be 'tutor' or 'job'", 400)
+
+    try:
+        criteria, cached = extraction_proxy.extract(mode, prompt)
+    except Exception as ex:
+        # Let the web app fall back to its keyword extractor
+        app.logger.warning("LLM extraction failed: %s", ex)
+        return wire.error("upstream extraction failed", 502)
+
+    return respond({"criteria": criteria, "cached": cached})
+
+# Typo-tolerant fallback parser (no LLM involved)
+# Body: {"prompt": "...", "mode": "tutor" | "job"}
+@app.route('/parse', methods=['POST'])
+def parse_prompt():
+    data = wire.read_body()
+    mode = data.get('mode', 'tutor')
+    if mode not in ('tutor', 'job'):
+        return wire.error("mode must be 'tutor' or 'job'", 400)
+
+    criteria, corrections = fuzzy.parse_prompt(fuzzy_index, _body_prompt(data), mode)
+    return respond({"criteria": criteria, "corrections": corrections})
+
+# Fuzzy search mode: resolve free text against the vocabularies and tutor names
+# e.g. GET /fuzzy/search?q=chemestry+dhanmondy&kind=subject&kind=area
+@app.route('/fuzzy/search', methods=['GET'])
+def fuzzy_search():
+    query = request.args.get('q', '')
+    kinds = set(request.args.getlist('kind')) or None
+    limit = request.args.get('limit', 5, type=int)
+
+    phrases = fuzzy_index.scan(query, kinds=kinds)
+    return respond({
+        "query": query,
+        "matches": [
+            {
+                "input": matched,
+                "candidates": [
+                    {"value": canonical, "kind": kind, "term": term, "distance": distance}
+                    for canonical, kind, term, distance in fuzzy_index.lookup(matched, kinds=kinds, limit=limit)
+                ],
+            }
+            for _, _, matched, _ in phrases
+        ],
     })
 
+# Typeahead for the search boxes: subjects, classes, areas, cities and tutor names
+# Query: ?q=mat&limit=8&kind=subject (kind may repeat; limit is capped at 20)
+@app.route('/autocomplete', methods=['GET'])
+def autocomplete_prefix():
+    query = request.args.get('q', '')
+    kinds = set(request.args.getlist('kind')) or None
+    limit = max(1, min(request.args.get('limit', autocomplete.DEFAULT_K, type=int), autocomplete.MAX_K))
+    return respond({
+        "query": query,
+        "completions": [c.to_dict() for c in autocomplete_index.complete(query, limit, kinds)],
+    })
+
+# Web app pushes the names of verified tutors so they can be matched fuzzily
+# Body: {"tutors": ["Full Name", ...]}
+@app.route('/vocabulary/tutors', methods=['POST'])
+def update_tutor_vocabulary():
+    global tutor_names, fuzzy_index
+    data = wire.read_body()
+    tutor_names = [n for n in _body_list(data, 'tutors') if isinstance(n, str)]
+    fuzzy_index = fuzzy.build_index(tutor_names, FUZZY_INDEX_PATH)
+    _rebuild_autocomplete()
+    return respond({"tutors": len(tutor_names), "terms": len(fuzzy_index.entries)})
+
+# Web app pushes the full searchable tutor set; replaces the current index
+# Body: {"tutors": [{"TutorID": 1, "FullName": ..., "Subjects": ..., "Availability": "Sun-Thu evening", ...}],
+#        "variant": "csharp"}
+@app.route('/index/tutors', methods=['POST'])
+def index_tutors():
+    global tutor_names, fuzzy_index
+    data = wire.read_body()
+    variant = data.get('variant', 'csharp')
+    if variant not in RANKERS:
+        return wire.error(f"variant must be one of {sorted(RANKERS)}", 400)
+
+    tutors = [t for t in _body_list(data, 'tutors') if isinstance(t, dict) and t.get('TutorID') is not None]
+    _swap_tutor_index(TutorIndex(tutors, variant))
+
+    tutor_names = [t['FullName'] for t in tutors if t.get('FullName') and t.get('IsVerified')]
+    fuzzy_index = fuzzy.build_index(tutor_names, FUZZY_INDEX_PATH)
+    _rebuild_autocomplete()
+    return respond({"tutors": len(tutor_index), "variant": variant})
+
+# Parse free-text schedules (TuitionOffer.DaysPerWeek, tutor availability) into bitsets
+# Body: {"text": "3 days, Sun Tue Thu evening"}
+@app.route('/schedule/parse', methods=['POST'])
+def schedule_parse():
+    data = wire.read_body()
+    text = data.get('text', '')
+    if not isinstance(text, str):
+        return wire.error("text must be a string", 400)
+    return respond(parse_schedule(text).to_dict())
+
+def _valid_salary(offer):
+    return isinstance(offer, dict) and isinstance(offer.get('Salary'), (int, float)) and offer['Salary'] > 0
+
+# Web app pushes all existing offers; rebuilds the salary sketches by merging cells up
+# Body: {"offers": [{"Id": 1, "Subject": ..., "StudentClass": ..., "Location": ..., "Medium": ..., "Salary": 6000, ...}]}
+@app.route('/index/offers', methods=['POST'])
+def index_offers():
+    global salary_index, offer_index
+    data = wire.read_body()
+    # A repeated Id is one offer (the last copy), not two salary samples
+    offers = {o['Id']: o for o in _body_list(data, 'offers') if _valid_salary(o) and o.get('Id') is not None}
+    offers = list(offers.values())
+    salary_index = SalaryIndex.build(((offer_cell(o, fuzzy_index), o['Salary']) for o in offers),
+                                     offer_ids=[o['Id'] for o in offers])
+    _save_salaries()
+    offer_index = OfferIndex(offers)
+    _rebuild_autocomplete()
+    return respond({"offers": len(offers), "duplicates": len(offer_index.duplicates.duplicate_of)})
+
+# Called when a guardian posts a new offer
+# Body: a single TuitionOffer record
+@app.route('/offers', methods=['POST'])
+def add_offer():
+    offer = wire.read_body()
+    if not _valid_salary(offer) or offer.get('Id') is None:
+        return wire.error("Id and Salary are required", 400)
+    duplicate_of = offer_index.add(offer)
+    # Counted only once indexing succeeded, so a failed request can be retried;
+    # a re-sent offer (edited, filled or closed) is already counted
+    if salary_index.add(offer_cell(offer, fuzzy_index), offer['Salary'], offer['Id']):
+        _save_salaries()
+    return respond({"indexed": True, "duplicate_of": duplicate_of})
+
+# Called when a guardian deletes an offer
+@app.route('/offers/<int:offer_id>', methods=['DELETE'])
+def remove_offer(offer_id):
+    return respond({"removed": offer_index.remove(offer_id)})
+
+# Called when an offer is filled or closed; only open offers stay searchable
+# Body: {"Status": 1} (JobStatus, as a number or a name)
+@app.route('/offers/<int:offer_id>', methods=['PATCH'])
+def update_offer_status(offer_id):
+    data = wire.read_body()
+    if 'Status' not in data:
+        return wire.error("Status is required", 400)
+    return respond({"removed": offer_index.update_status(offer_id, data['Status'])})
+
+# Bulk near-duplicate pass, over the offers in the body or the indexed ones
+# Body: {"offers": [...], "threshold": 0.8}, both optional
+@app.route('/dedup', methods=['POST'])
+def dedup_offers():
+    data = wire.read_body()
+    offers = [o for o in _body_list(data, 'offers') if isinstance(o, dict) and o.get('Id') is not None]
+    threshold = data.get('threshold', THRESHOLD)
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not 0 < threshold <= 1:
+        return wire.error("threshold must be a number between 0 and 1", 400)
+    if offers:
+        groups = find_duplicate_groups(offers, threshold).groups()
+    elif threshold != THRESHOLD:
+        groups = find_duplicate_groups(list(offer_index.offers.values()), threshold).groups()
+    else:
+        # The live index already clusters every offer at the default threshold
+        groups = offer_index.duplicates.groups()
+    return respond({
+        "groups": [{"original": original, "duplicates": dups} for original, dups in sorted(groups.items())],
+        "duplicate_count": sum(len(d) for d in groups.values()),
+    }, table="groups")
+
+# Market rate for a subject x class x area x medium combination
+# e.g. GET /salary/estimate?subject=Math&class=Class+8&area=Mirpur&medium=Bangla
+@app.route('/salary/estimate', methods=['GET'])
+def salary_estimate():
+    cell = query_cell(fuzzy_index, request.args.get('subject'), request.args.get('class'),
+                      request.args.get('area'), request.args.get('medium'))
+    min_samples = request.args.get('min_samples', 10, type=int)
+    return respond(salary_index.estimate(cell, min_samples=min_samples))
+
+def _body_limit(data, default=20, maximum=200):
+    limit = data.get('limit', default)
+    if isinstance(limit, bool) or not isinstance(limit, (int, float, str)):
+        raise wire.WireError("limit must be a positive integer")
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise wire.WireError("limit must be a positive integer")
+    if limit < 1:
+        raise wire.WireError("limit must be a positive integer")
+    return min(limit, maximum)
+
 # SRS FR-16 & FR-17: Recommendation Endpoint
-# We will implement the actual NLP logic here in Sprint 2
+# Body: {"prompt": "...", "criteria": {...} (optional, e.g. from /extract),
+#        "schedule": "Sun Tue Thu 4-6pm" (optional, the offer's DaysPerWeek), "limit": 20}
 @app.route('/recommend', methods=['POST'])
 def recommend_teachers():
-    # Placeholder for Sprint 1
-    data = request.json
-    guardian_prompt = data.get('prompt', '')
-    
-    # TODO (Sprint 2): Implement NLP extraction logic here
-    # 1. Parse prompt (e.g., "Need math teacher in Mirpur")
-    # 2. Filter tutors from database (or cached list)
-    # 3. Return ranked list
-    
-    return jsonify({
-        "message": "AI Recommendation Endpoint Reachable",
+    data = wire.read_body()
+    guardian_prompt = _body_prompt(data)
+
+    criteria = _body_criteria(data)
+    if criteria is None:
+        criteria, _ = fuzzy.parse_prompt(fuzzy_index, guardian_prompt, 'tutor')
+
+    if data.get('schedule') is not None and not isinstance(data['schedule'], str):
+        return wire.error("schedule must be a string", 400)
+    query = normalize_query(criteria, data.get('schedule'), _body_limit(data))
+    schedule = parse_schedule(query['schedule']) if query['schedule'] else None
+    prompt = normalize_text(guardian_prompt)
+
+    started = time.perf_counter()
+    tutors, used_prompt = tutor_index.search(query['criteria'], prompt, schedule, query['limit'])
+    if used_prompt:
+        query['prompt'] = prompt
+    query_log.record(query, (time.perf_counter() - started) * 1000)
+
+    return respond({
         "prompt_received": guardian_prompt,
-        "recommended_tutors": [] 
+        "criteria": criteria,
+        "recommended_tutors": tutors,
+    }, table="recommended_tutors")
+
+# Most frequent /recommend queries (Space-Saving estimates; "error" bounds the overcount)
+# Query: ?n=20
+@app.route('/queries/top', methods=['GET'])
+def top_queries():
+    n = max(1, min(request.args.get('n', 20, type=int), 1000))
+    return respond({
+        "queries": [{"query": query, "count": count, "error": error}
+                    for query, count, error in query_log.top(n)],
     })
 
+# SRS FR-16 & FR-17: Job recommendations for teachers
+# Body: {"prompt": "...", "criteria": {...} (optional), "limit": 20, "collapse": true}
+@app.route('/recommend/jobs', methods=['POST'])
+def recommend_jobs():
+    data = wire.read_body()
+    teacher_prompt = _body_prompt(data)
+
+    criteria = _body_criteria(data)
+    if criteria is None:
+        criteria, _ = fuzzy.parse_prompt(fuzzy_index, teacher_prompt, 'job')
+
+    jobs = offer_index.recommend(criteria, teacher_prompt, _body_limit(data),
+                                 collapse=bool(data.get('collapse', True)))
+    return respond({
+        "prompt_received": teacher_prompt,
+        "criteria": criteria,
+        "recommended_jobs": jobs,
+    }, table="recommended_jobs")
+
 if __name__ == '__main__':
+    # HTTP/1.1 so callers can keep connections alive between requests
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
     # Run on port 5000 (Standard Flask Port)
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=True, port=5000, threaded=True)
\ No newline at end of file
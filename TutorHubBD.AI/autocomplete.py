@@ -0,0 +1,148 @@
+# Typeahead over subjects, classes, areas and verified tutor names
+#
+# Called on every keystroke, so a lookup must not touch the database or scan
+# the vocabulary. Completions are kept in a sorted array of keys; the top
+# MAX_K completions for every prefix up to MAX_PREFIX characters, overall and
+# per kind, are precomputed (the nodes of an implicit trie over that array),
+# so a lookup is one dict read per requested kind. Only longer prefixes, which
+# match few keys, binary-search the sorted keys.
+
+import bisect
+import heapq
+import re
+from itertools import islice
+
+import vocabulary
+
+MAX_PREFIX = 12
+DEFAULT_K = 8
+MAX_K = 20  # largest limit served; larger requests are capped
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text):
+    return _SPACE_RE.sub(" ", (text or "").lower()).strip()
+
+
+class Completion:
+    __slots__ = ("text", "kind", "weight")
+
+    def __init__(self, text, kind, weight):
+        self.text = text
+        self.kind = kind
+        self.weight = weight
+
+    def to_dict(self):
+        return {"text": self.text, "kind": self.kind, "weight": self.weight}
+
+
+class AutocompleteIndex:
+    def __init__(self, completions, k=MAX_K):
+        """completions: iterable of (display text, kind, weight, [search keys]).
+        k: how many completions are precomputed (and at most returned) per prefix."""
+        self.k = k
+        self.entries = []
+        pairs = []
+        for text, kind, weight, keys in completions:
+            index = len(self.entries)
+            self.entries.append(Completion(text, kind, weight))
+            for key in {normalize(key) for key in keys}:
+                if key:
+                    pairs.append((key, index))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_entries = [index for _, index in pairs]
+
+        # Heaviest first, so each prefix bucket fills with its top-k and stops
+        self.top = {}          # prefix -> [entry index]
+        self.top_by_kind = {}  # (kind, prefix) -> [entry index]
+        for key, index in sorted(pairs, key=lambda p: -self.entries[p[1]].weight):
+            kind = self.entries[index].kind
+            for n in range(1, min(len(key), MAX_PREFIX) + 1):
+                for table, bucket_key in ((self.top, key[:n]), (self.top_by_kind, (kind, key[:n]))):
+                    bucket = table.setdefault(bucket_key, [])
+                    if len(bucket) < k and index not in bucket:
+                        bucket.append(index)
+
+    def complete(self, prefix, k=DEFAULT_K, kinds=None):
+        prefix = normalize(prefix)
+        k = min(k or DEFAULT_K, self.k)
+        if not prefix:
+            return []
+        if len(prefix) <= MAX_PREFIX:
+            if not kinds:
+                best = self.top.get(prefix, ())
+            else:
+                # Each kind's bucket is already heaviest first
+                buckets = [self.top_by_kind.get((kind, prefix), ()) for kind in kinds]
+                best = heapq.merge(*buckets, key=lambda i: -self.entries[i].weight)
+            return [self.entries[i] for i in islice(best, k)]
+
+        # Long prefix: binary search the (short) key range
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff")
+        candidates = {self.key_entries[i] for i in range(lo, hi)}
+        if kinds:
+            candidates = {i for i in candidates if self.entries[i].kind in kinds}
+        best = heapq.nlargest(k, candidates, key=lambda i: (self.entries[i].weight, -i))
+        return [self.entries[i] for i in best]
+
+
+def _display(term):
+    # "ict" -> "ICT", "social science" -> "Social Science"
+    return term.upper() if len(term) <= 3 else term.title()
+
+
+def _count_mentions(texts, terms):
+    """How many of the texts mention each term (substring match, like the web app's filters)."""
+    counts = dict.fromkeys(terms, 0)
+    for text in texts:
+        text = (text or "").lower()
+        for term in terms:
+            if term in text:
+                counts[term] += 1
+    return counts
+
+
+def build_index(tutors=(), offers=(), k=DEFAULT_K):
+    """Vocabulary completions weighted by how many tutors and offers use them,
+    plus verified tutor names ordered by rating."""
+    subject_texts = [t.get("Subjects") for t in tutors] + [o.get("Subject") for o in offers]
+    class_texts = [t.get("PreferredClasses") for t in tutors] + [o.get("StudentClass") for o in offers]
+    area_texts = [t.get("PreferredLocations") for t in tutors] + \
+                 [f'{o.get("Location") or ""} {o.get("City") or ""}' for o in offers]
+
+    subject_counts = _count_mentions(subject_texts, vocabulary.SUBJECTS)
+    class_counts = _count_mentions(class_texts, list(vocabulary.CLASS_LEVELS))
+    area_counts = _count_mentions(area_texts, vocabulary.AREAS + vocabulary.CITIES)
+
+    completions = []
+
+    subjects = {}
+    for term in vocabulary.SUBJECTS:
+        canonical = vocabulary.SUBJECT_ALIASES.get(term, term)
+        text, weight, keys = subjects.get(canonical, (_display(canonical), 1, []))
+        subjects[canonical] = (text, weight + subject_counts[term], keys + [term])
+    completions += [(text, "subject", weight, keys) for text, weight, keys in subjects.values()]
+
+    classes = {}
+    for alias, canonical in vocabulary.CLASS_LEVELS.items():
+        weight, keys = classes.get(canonical, (1, []))
+        classes[canonical] = (weight + class_counts[alias], keys + [alias])
+    completions += [(canonical, "class", weight, keys) for canonical, (weight, keys) in classes.items()]
+
+    completions += [(area.title(), "area", 1 + area_counts[area], [area]) for area in vocabulary.AREAS]
+    completions += [(city.title(), "city", 1 + area_counts[city], [city]) for city in vocabulary.CITIES]
+
+    for t in tutors:
+        name = t.get("FullName")
+        if name and t.get("IsVerified"):
+            words = normalize(name).split()
+            # "raf" should find "Syed Rafi": index the name from every word onwards
+            keys = [" ".join(words[i:]) for i in range(len(words))]
+            # Rating (0-5) only orders tutors among themselves; a subject or area
+            # that any offer or profile uses still ranks above a name
+            completions.append((name, "tutor", 1 + float(t.get("Rating") or 0) / 5, keys))
+
+    return AutocompleteIndex(completions, k)
@@ -0,0 +1,176 @@
+# Near-duplicate offer detection with MinHash + LSH
+#
+# Guardians often repost the same job with small edits, which bloats the open
+# offer set and floods teachers with repeated results. Each offer's
+# Title/Description/Subject/Location is reduced to a MinHash signature; the
+# signature is cut into bands and each band is hashed into a bucket. Offers
+# that share any bucket are candidates, and only those are compared, so
+# finding the duplicates of a new offer is sub-linear in the table size.
+
+import re
+import threading
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from ranking import parse_datetime
+
+NUM_PERM = 128
+# 16 bands x 8 rows: two offers become candidates with probability
+# 1 - (1 - s^8)^16 at Jaccard s, i.e. ~61% at 0.7 and ~95% at THRESHOLD (0.8)
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.8     # estimated Jaccard similarity at which two offers count as duplicates
+SHINGLE_SIZE = 4
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures must be comparable across restarts and workers
+_rng = np.random.RandomState(20260105)
+_PERM_A = _rng.randint(1, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def offer_text(offer):
+    parts = (offer.get(f) or "" for f in ("Title", "Description", "Subject", "Location"))
+    return " ".join(re.sub(r"[^\w\s]", " ", " ".join(parts).lower()).split())
+
+
+def offer_facets(offer):
+    """Subject and Location must agree too: the same wording for Math in Mirpur
+    and Physics in Uttara is two different jobs, not a repost."""
+    return tuple(" ".join(str(offer.get(f) or "").lower().split()) for f in ("Subject", "Location"))
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Character n-grams; robust to the small edits people make when reposting."""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint32 values, stored as uint64)."""
+    grams = shingles(text)
+    if not grams:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    # crc32 rather than hash(): Python's str hash is salted per process
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class DuplicateIndex:
+    """LSH banded index over offer signatures.
+
+    Every offer is attached to a cluster whose representative is the first
+    (oldest) offer seen; duplicates point at it through `duplicate_of`."""
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.signatures = {}
+        self.facets = {}
+        self.buckets = [dict() for _ in range(BANDS)]
+        self.duplicate_of = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def _band_keys(sig):
+        return [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def _candidates(self, keys):
+        found = set()
+        for band, key in enumerate(keys):
+            found.update(self.buckets[band].get(key, ()))
+        return found
+
+    def query(self, offer):
+        """[(offer id, similarity)] of indexed offers that look like this one, most similar first."""
+        sig = signature(offer_text(offer))
+        with self._lock:
+            return self._matches(offer.get("Id"), offer_facets(offer), sig, self._band_keys(sig))
+
+    def _matches(self, offer_id, facets, sig, keys):
+        matches = []
+        for other in self._candidates(keys):
+            if other == offer_id or self.facets[other] != facets:
+                continue
+            score = similarity(sig, self.signatures[other])
+            if score >= self.threshold:
+                matches.append((other, score))
+        matches.sort(key=lambda m: -m[1])
+        return matches
+
+    def add(self, offer):
+        """Indexes an offer and returns the ID of the offer it duplicates (or None).
+        An offer whose Id is already indexed replaces the old copy."""
+        offer_id = offer["Id"]
+        facets = offer_facets(offer)
+        sig = signature(offer_text(offer))
+        keys = self._band_keys(sig)
+        with self._lock:
+            self._remove(offer_id)
+            matches = self._matches(offer_id, facets, sig, keys)
+            original = None
+            if matches:
+                best = matches[0][0]
+                original = self.duplicate_of.get(best, best)
+                self.duplicate_of[offer_id] = original
+            self.signatures[offer_id] = sig
+            self.facets[offer_id] = facets
+            for band, key in enumerate(keys):
+                self.buckets[band].setdefault(key, []).append(offer_id)
+            return original
+
+    def remove(self, offer_id):
+        """Drops a deleted or filled offer. If it represented a cluster, the
+        oldest remaining duplicate takes over."""
+        with self._lock:
+            self._remove(offer_id)
+
+    def _remove(self, offer_id):
+        sig = self.signatures.pop(offer_id, None)
+        if sig is None:
+            return
+        del self.facets[offer_id]
+        for band, key in enumerate(self._band_keys(sig)):
+            bucket = self.buckets[band][key]
+            bucket.remove(offer_id)
+            if not bucket:
+                del self.buckets[band][key]
+
+        self.duplicate_of.pop(offer_id, None)
+        members = [k for k, v in self.duplicate_of.items() if v == offer_id]
+        if members:
+            successor = members[0]
+            del self.duplicate_of[successor]
+            for member in members[1:]:
+                self.duplicate_of[member] = successor
+
+    def canonical(self, offer_id):
+        return self.duplicate_of.get(offer_id, offer_id)
+
+    def groups(self):
+        """{representative id: [duplicate ids]} for every cluster with duplicates."""
+        clusters = {}
+        for offer_id, original in self.duplicate_of.items():
+            clusters.setdefault(original, []).append(offer_id)
+        return {k: sorted(v) for k, v in clusters.items()}
+
+
+def find_duplicate_groups(offers, threshold=THRESHOLD):
+    """Bulk dedup pass over an existing table; oldest offer of each cluster wins."""
+    index = DuplicateIndex(threshold)
+    for offer in sorted(offers, key=lambda o: (parse_datetime(o.get("CreatedAt")) or datetime.min, o["Id"])):
+        index.add(offer)
+    return index
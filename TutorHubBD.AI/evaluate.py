@@ -0,0 +1,307 @@
+# Offline ranking evaluation: replay historical hires
+#
+# For every TuitionOffer with a HiredTutorId we rebuild the tutor index as it
+# stood at the offer's CreatedAt, ask a ranker for recommendations using the
+# query a guardian would have typed, and record where the tutor who was
+# actually hired ended up. The web app stores Subject as "General", so the
+# query is extracted from Title/Description (plus StudentClass and Location)
+# with the same typo-tolerant parser as /parse. Offers are sharded across a
+# process pool in CreatedAt order, so each worker only rebuilds its index
+# when tutors have joined or been reviewed since its previous offer.
+#
+# Only join times and ratings are replayed "as of CreatedAt". Rating is
+# rebuilt from the Reviews export when one is given (otherwise the current
+# rating, which includes the review of this very hire, is used). Bio,
+# IsVerified and the other profile fields have no history and are always the
+# current values; every report lists these leaks under "current_state_fields".
+#
+# Usage (exports of the Tutors / TuitionOffers / TuitionRequests / Reviews tables, CSV or JSON):
+#   python evaluate.py --tutors tutors.csv --offers offers.csv \
+#       [--requests requests.csv] [--reviews reviews.csv] --variant csharp --variant soft \
+#       [--workers 8] [--k 1 5 10 20] [--out report.json]
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import fuzzy
+from ranking import RANKERS, parse_datetime
+
+DEFAULT_K = (1, 5, 10, 20)
+
+# Filled in each worker by _init_worker so tutors are pickled once per process
+_worker_state = {}
+
+
+def load_records(path):
+    """Reads a CSV or JSON (list of objects) table export."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def _parse_int(value):
+    if value in (None, "", "NULL"):
+        return None
+    return int(float(value))
+
+
+def normalize_tutor(row):
+    return {
+        "TutorID": _parse_int(row.get("TutorID")),
+        "Subjects": row.get("Subjects") or "",
+        "PreferredClasses": row.get("PreferredClasses") or "",
+        "PreferredLocations": row.get("PreferredLocations") or "",
+        "Bio": row.get("Bio") or "",
+        "Education": row.get("Education") or "",
+        "Experience": _parse_int(row.get("Experience")),
+        "Rating": float(row.get("Rating") or 0),
+        "IsVerified": _parse_bool(row.get("IsVerified")),
+        "IsProfileComplete": _parse_bool(row.get("IsProfileComplete")),
+        "VerificationRequestDate": parse_datetime(row.get("VerificationRequestDate")),
+    }
+
+
+def normalize_offer(row):
+    return {
+        "Id": _parse_int(row.get("Id")),
+        "Title": row.get("Title") or "",
+        "Description": row.get("Description") or "",
+        "Subject": row.get("Subject") or None,
+        "StudentClass": row.get("StudentClass") or None,
+        "City": row.get("City") or None,
+        "Location": row.get("Location") or None,
+        "CreatedAt": parse_datetime(row.get("CreatedAt")),
+        "HiredTutorId": _parse_int(row.get("HiredTutorId")),
+    }
+
+
+def normalize_review(row):
+    return {
+        "TutorId": _parse_int(row.get("TutorId")),
+        "Rating": float(row.get("Rating") or 0),
+        "CreatedAt": parse_datetime(row.get("CreatedAt")),
+    }
+
+
+def rating_history(reviews):
+    """{tutor id: (review times, running averages)} so a tutor's Rating as of any
+    moment is a bisect, matching ReviewController.UpdateTutorRating."""
+    by_tutor = {}
+    for r in sorted((r for r in reviews if r["TutorId"] is not None and r["CreatedAt"] is not None),
+                    key=lambda r: r["CreatedAt"]):
+        times, averages = by_tutor.setdefault(r["TutorId"], ([], []))
+        total = (averages[-1] * len(averages) if averages else 0.0) + r["Rating"]
+        times.append(r["CreatedAt"])
+        averages.append(total / (len(averages) + 1))
+    return by_tutor
+
+
+def rating_as_of(history, tutor_id, when):
+    times, averages = history.get(tutor_id, ((), ()))
+    seen = bisect.bisect_left(times, when)
+    return averages[seen - 1] if seen else 0.0
+
+
+def tutor_timeline(tutors, requests=()):
+    """Sorts tutors by when they became visible: the earliest of their
+    verification request and their first application. Tutors with neither
+    date are treated as present from the start."""
+    first_seen = {}
+    for r in requests:
+        tutor_id = _parse_int(r.get("TutorId"))
+        when = parse_datetime(r.get("RequestDate"))
+        if tutor_id is not None and when is not None:
+            first_seen[tutor_id] = min(when, first_seen.get(tutor_id, when))
+
+    timeline = []
+    for t in tutors:
+        dates = [d for d in (t["VerificationRequestDate"], first_seen.get(t["TutorID"])) if d]
+        timeline.append((min(dates) if dates else datetime.min, t))
+    timeline.sort(key=lambda item: item[0])
+    return [when for when, _ in timeline], [t for _, t in timeline]
+
+
+def offer_criteria(offer, index):
+    """The query a guardian posting this offer would have issued.
+
+    The structured fields go first so they win over mentions in the text;
+    "General" and free-text locations ("Mirpur 10") resolve to vocabulary terms
+    or to nothing."""
+    prompt = f'{offer["Title"]} {offer["Description"]}'.strip()
+    text = " ".join(v for v in (offer["Subject"], offer["StudentClass"], offer["Location"],
+                                offer.get("City"), prompt) if v)
+    criteria, _ = fuzzy.parse_prompt(index, text, "tutor")
+    return criteria, prompt
+
+
+def _init_worker(variant, join_times, tutors, ratings, review_times):
+    _worker_state.update(variant=variant, join_times=join_times, tutors=tutors,
+                         ratings=ratings, review_times=review_times)
+
+
+def _replay_shard(offers):
+    """Runs in a worker: replays a CreatedAt-ordered slice of offers."""
+    ranker_cls = RANKERS[_worker_state["variant"]]
+    join_times = _worker_state["join_times"]
+    tutors = _worker_state["tutors"]
+    ratings = _worker_state["ratings"]
+    review_times = _worker_state["review_times"]
+
+    position = {t["TutorID"]: i for i, t in enumerate(tutors)}
+
+    ranks, latencies = [], []
+    unreachable = 0
+    built_upto, ranker, build_seconds = None, None, 0.0
+    for offer in offers:
+        when = offer["CreatedAt"]
+        visible = bisect.bisect_right(join_times, when)
+        reviewed = bisect.bisect_left(review_times, when)
+        if (visible, reviewed) != built_upto:
+            started = time.perf_counter()
+            snapshot = tutors[:visible]
+            if ratings is not None:
+                snapshot = [dict(t, Rating=rating_as_of(ratings, t["TutorID"], when)) for t in snapshot]
+            ranker = ranker_cls(snapshot)
+            build_seconds += time.perf_counter() - started
+            built_upto = (visible, reviewed)
+        if position.get(offer["HiredTutorId"], visible) >= visible:
+            unreachable += 1
+            continue
+
+        criteria, prompt = offer["Criteria"], offer["Prompt"]
+        started = time.perf_counter()
+        ranked = ranker.rank(criteria, prompt)
+        latencies.append(time.perf_counter() - started)
+
+        try:
+            ranks.append(ranked.index(offer["HiredTutorId"]) + 1)
+        except ValueError:
+            ranks.append(None)
+    return {"ranks": ranks, "latencies": latencies, "unreachable": unreachable, "build_seconds": build_seconds}
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(variant, shards, k_values, current_state_fields=()):
+    ranks = [r for s in shards for r in s["ranks"]]
+    latencies_ms = [l * 1000 for s in shards for l in s["latencies"]]
+    evaluated = len(ranks)
+    metrics = {f"recall@{k}": (sum(1 for r in ranks if r and r <= k) / evaluated if evaluated else 0.0)
+               for k in k_values}
+    metrics["mrr"] = sum(1.0 / r for r in ranks if r) / evaluated if evaluated else 0.0
+    return {
+        "variant": variant,
+        "evaluated": evaluated,
+        "unreachable": sum(s["unreachable"] for s in shards),
+        "metrics": metrics,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies_ms) if latencies_ms else 0.0,
+            "p50": _percentile(latencies_ms, 0.50),
+            "p95": _percentile(latencies_ms, 0.95),
+            "p99": _percentile(latencies_ms, 0.99),
+        },
+        "index_build_seconds": sum(s["build_seconds"] for s in shards),
+        # Profile fields taken from today's export rather than as of each offer
+        "current_state_fields": list(current_state_fields),
+    }
+
+
+def evaluate(variant, tutors, offers, requests=(), workers=None, k_values=DEFAULT_K, reviews=None):
+    """Replays every hired offer against `variant` and returns its report.
+
+    reviews: normalized Reviews rows; without them tutors keep their current Rating."""
+    if variant not in RANKERS:
+        raise ValueError(f"Unknown ranking variant '{variant}'. Available: {', '.join(sorted(RANKERS))}")
+
+    join_times, ordered_tutors = tutor_timeline(tutors, requests)
+    ratings = rating_history(reviews) if reviews is not None else None
+    review_times = sorted(t for times, _ in (ratings or {}).values() for t in times)
+
+    index = fuzzy.build_index()
+    hired = []
+    for o in offers:
+        if o["HiredTutorId"] is not None and o["CreatedAt"] is not None:
+            criteria, prompt = offer_criteria(o, index)
+            hired.append(dict(o, Criteria=criteria, Prompt=prompt))
+    hired.sort(key=lambda o: o["CreatedAt"])
+
+    workers = workers or os.cpu_count() or 1
+    # Contiguous time slices keep index rebuilds per worker to a minimum
+    shard_size = max(1, -(-len(hired) // (workers * 4)))
+    shards = [hired[i:i + shard_size] for i in range(0, len(hired), shard_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(variant, join_times, ordered_tutors, ratings, review_times)) as pool:
+        results = list(pool.map(_replay_shard, shards))
+
+    leaks = ["Bio", "IsVerified", "IsProfileComplete", "Subjects", "PreferredClasses", "PreferredLocations"]
+    if ratings is None:
+        leaks.insert(0, "Rating")
+    return summarize(variant, results, k_values, leaks)
+
+
+def print_comparison(reports, k_values, out=sys.stdout):
+    columns = [f"recall@{k}" for k in k_values] + ["mrr"]
+    header = f'{"variant":<12}{"queries":>9}' + "".join(f"{c:>11}" for c in columns) + f'{"p50 ms":>10}{"p95 ms":>10}'
+    print(header, file=out)
+    for r in reports:
+        row = f'{r["variant"]:<12}{r["evaluated"]:>9}'
+        row += "".join(f'{r["metrics"][c]:>11.4f}' for c in columns)
+        row += f'{r["latency_ms"]["p50"]:>10.3f}{r["latency_ms"]["p95"]:>10.3f}'
+        print(row, file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay historical hires against ranking variants.")
+    parser.add_argument("--tutors", required=True, help="Tutors table export (CSV or JSON)")
+    parser.add_argument("--offers", required=True, help="TuitionOffers table export (CSV or JSON)")
+    parser.add_argument("--requests", help="TuitionRequests table export, used to date tutors")
+    parser.add_argument("--reviews", help="Reviews table export, used to rebuild ratings as of each offer")
+    parser.add_argument("--variant", action="append", choices=sorted(RANKERS),
+                        help="Ranking variant(s) to evaluate (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--k", type=int, nargs="+", default=list(DEFAULT_K), help="Cut-offs for recall@k")
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    tutors = [normalize_tutor(r) for r in load_records(args.tutors)]
+    offers = [normalize_offer(r) for r in load_records(args.offers)]
+    requests = load_records(args.requests) if args.requests else []
+    reviews = [normalize_review(r) for r in load_records(args.reviews)] if args.reviews else None
+
+    reports = [evaluate(v, tutors, offers, requests, args.workers, args.k, reviews)
+               for v in (args.variant or sorted(RANKERS))]
+    print_comparison(reports, args.k)
+    if reports:
+        print(f'Fields taken from the current export, not as of each offer: '
+              f'{", ".join(reports[0]["current_state_fields"])}', file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"generated_at": datetime.now().isoformat(timespec="seconds"),
+                       "k": args.k, "reports": reports}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+# Criteria extraction proxy (SRS FR-16 / FR-17)
+#
+# The web app used to call Gemini directly for every search prompt and throw
+# the answer away. This module lets the AI service sit in front of the LLM:
+#   * a persistent SQLite cache of normalized prompt -> extracted criteria,
+#     shared by every worker process and kept across restarts
+#   * a micro-batcher that folds concurrent cache misses into one upstream
+#     generateContent call
+# The upstream endpoint is configurable, so tests can point it at stub_llm.py.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+
+GEMINI_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+
+# Same instructions the web app sends (AiSearchService), reworded so that the
+# model answers several numbered queries at once with a JSON array and tags
+# each answer with the number of the query it belongs to.
+SYSTEM_PROMPTS = {
+    "tutor": """You are an entity extractor for a tutor matching system in Bangladesh.
+For EACH numbered user query below, extract the following fields:
+{
+    "Subject": "extracted subject like Math, English, Physics, Chemistry, Biology, Bangla, ICT, Accounting, etc.",
+    "ClassLevel": "extracted class level like Nursery, KG, Class 1-10, HSC, A-Level, O-Level, University",
+    "Location": "extracted location in Bangladesh like Dhaka, Mirpur, Uttara, Dhanmondi, Gulshan, Chittagong, etc.",
+    "GenderPreference": "Male or Female if mentioned, otherwise null",
+    "Keywords": ["array of adjectives/qualities like patient, experienced, friendly, strict, professional"]
+}""",
+    "job": """You are an entity extractor for a tuition job matching system in Bangladesh.
+A tutor is looking for tuition jobs. For EACH numbered query below, extract the following fields:
+{
+    "Subject": "extracted subject like Math, English, Physics, Chemistry, Biology, Bangla, ICT, Accounting, etc.",
+    "ClassLevel": "extracted class level like Nursery, KG, Class 1-10, HSC, A-Level, O-Level",
+    "City": "extracted city like Dhaka, Chittagong, Sylhet, Khulna, Rajshahi, etc.",
+    "Location": "specific area like Mirpur, Uttara, Dhanmondi, Gulshan, Banani, etc.",
+    "Medium": "Bangla or English if mentioned, otherwise null",
+    "MinSalary": number if minimum salary mentioned (e.g., 5000), otherwise null,
+    "MaxSalary": number if maximum salary mentioned, otherwise null,
+    "Keywords": ["array of preferences like flexible, nearby, experienced, part-time, full-time"]
+}""",
+}
+
+BATCH_RULES = """
+Rules:
+- Return ONLY a JSON array with exactly one object per query
+- Every object must also have "Query": the number of the query it answers
+- No markdown, no code blocks, no explanation
+- Use null for fields not mentioned
+- Keywords should be an array of strings
+- Be flexible with spelling variations"""
+
+# Old web app budget was 500 output tokens per prompt
+TOKENS_PER_PROMPT = 500
+
+
+def normalize_prompt(prompt):
+    """Lower-case, drop punctuation and collapse whitespace so trivially
+    different prompts ("Math tutor, Mirpur!" / "math tutor mirpur") share a cache entry.
+    Only used as the cache key: the LLM always sees what the user typed."""
+    text = re.sub(r"[^\w\s\-]", " ", (prompt or "").lower())
+    return " ".join(text.split())
+
+
+class BatchMismatchError(ValueError):
+    """The model's answers could not be matched one-to-one to the queries."""
+
+
+def build_batch_prompt(mode, prompts):
+    # One line per query: a newline inside a prompt would otherwise start a
+    # new "query" and shift every answer after it
+    numbered = "\n".join(f"{i + 1}. {' '.join(p.split())}" for i, p in enumerate(prompts))
+    return f"{SYSTEM_PROMPTS[mode]}\n{BATCH_RULES}\n\nQueries:\n{numbered}"
+
+
+def parse_batch_response(text, expected):
+    """Parse the model's text into a list of criteria dicts, one per query
+    (None where the model answered with something other than an object).
+
+    Answers are matched to queries by their "Query" number, never by position,
+    so a reordered answer is not cached under another user's prompt. Raises
+    BatchMismatchError when that matching is not one-to-one."""
+    text = text.replace("```json", "").replace("```", "").strip()
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or len(data) != expected:
+        raise BatchMismatchError(
+            f"Expected {expected} results from LLM, got {len(data) if isinstance(data, list) else 'non-list'}")
+    if expected == 1 and isinstance(data[0], dict) and "Query" not in data[0]:
+        return data  # a single answer needs no number
+
+    results = [None] * expected
+    answered = set()
+    for item in data:
+        number = item.pop("Query", None) if isinstance(item, dict) else None
+        if isinstance(number, str) and number.strip().isdigit():
+            number = int(number)
+        if isinstance(number, bool) or not isinstance(number, int) or not 1 <= number <= expected \
+                or number in answered:
+            raise BatchMismatchError(f"LLM answer has a missing or repeated query number: {number!r}")
+        answered.add(number)
+        results[number - 1] = item
+    return results
+
+
+def is_usable(criteria):
+    """At least one field extracted; all-null answers are not worth caching or returning."""
+    return isinstance(criteria, dict) and any(v not in (None, "", []) for v in criteria.values())
+
+
+class ExtractionCache:
+    """SQLite-backed cache keyed by (mode, normalized prompt).
+
+    WAL mode lets several gunicorn workers read while one writes, and the file
+    survives restarts. Each thread gets its own connection because sqlite3
+    connections must not be shared across threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " key TEXT PRIMARY KEY,"
+            " mode TEXT NOT NULL,"
+            " prompt TEXT NOT NULL,"
+            " criteria TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(mode, normalized):
+        return hashlib.sha1(f"{mode}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, mode, normalized):
+        row = self._connection().execute(
+            "SELECT criteria FROM extractions WHERE key = ?", (self._key(mode, normalized),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, mode, items):
+        """items: iterable of (normalized prompt, criteria dict)."""
+        now = time.time()
+        conn = self._connection()
+        conn.executemany(
+            "INSERT OR REPLACE INTO extractions (key, mode, prompt, criteria, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(self._key(mode, p), mode, p, json.dumps(c), now) for p, c in items],
+        )
+        conn.commit()
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+
+class LlmClient:
+    """Minimal Gemini generateContent client (stdlib only)."""
+
+    def __init__(self, endpoint=GEMINI_ENDPOINT, api_key=None, timeout=15.0):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def extract_batch(self, mode, prompts):
+        body = {
+            "contents": [{"parts": [{"text": build_batch_prompt(mode, prompts)}]}],
+            "generationConfig": {
+                "temperature": 0.1,
+                "maxOutputTokens": TOKENS_PER_PROMPT * len(prompts),
+            },
+        }
+        url = self.endpoint
+        if self.api_key:
+            url += ("&" if "?" in url else "?") + "key=" + self.api_key
+        req = urllib.request.Request(
+            url,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            payload = json.loads(resp.read().decode("utf-8"))
+        text = payload["candidates"][0]["content"]["parts"][0]["text"]
+        return parse_batch_response(text, len(prompts))
+
+
+class MicroBatcher:
+    """Collects concurrent cache misses and sends them upstream together.
+
+    The first miss opens a batch window of `window_ms`; every miss arriving
+    before it closes (up to `max_batch`) rides along. Identical prompts that
+    are already in flight share one Future instead of being sent twice.
+    Closed batches go to a pool of `max_inflight` upstream calls, so a slow
+    LLM reply doesn't hold up the batches collected behind it. A batch whose
+    answers don't line up with its queries is re-sent one prompt at a time.
+    """
+
+    def __init__(self, client, on_results=None, window_ms=20, max_batch=16, max_inflight=4):
+        self.client = client
+        self.on_results = on_results
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._upstream = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="extraction-upstream")
+        self._lock = threading.Condition()
+        self._pending = {}   # (mode, normalized) -> (Future, prompt as typed), not yet sent
+        self._inflight = {}  # (mode, normalized) -> Future, sent and awaiting reply
+        self._worker = threading.Thread(target=self._run, name="extraction-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, mode, normalized, prompt):
+        key = (mode, normalized)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending[0]
+            future = self._inflight.get(key)
+            if future is None:
+                future = Future()
+                self._pending[key] = (future, prompt)
+                self._lock.notify()
+            return future
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._lock.wait(remaining)
+                batch = list(self._pending.items())[: self.max_batch]
+                for key, (future, _) in batch:
+                    del self._pending[key]
+                    self._inflight[key] = future
+
+            by_mode = {}
+            for (mode, normalized), (future, prompt) in batch:
+                by_mode.setdefault(mode, []).append((normalized, prompt, future))
+            for mode, entries in by_mode.items():
+                self._upstream.submit(self._dispatch, mode, entries)
+
+    def _dispatch(self, mode, entries):
+        results, error = None, None
+        try:
+            results = self.client.extract_batch(mode, [prompt for _, prompt, _ in entries])
+        except BatchMismatchError as ex:
+            if len(entries) > 1:
+                for entry in entries:
+                    self._upstream.submit(self._dispatch, mode, [entry])
+                return
+            error = ex
+        except Exception as ex:
+            error = ex
+        if results is not None and self.on_results:
+            usable = [(normalized, r) for (normalized, _, _), r in zip(entries, results) if is_usable(r)]
+            try:
+                if usable:
+                    self.on_results(mode, usable)
+            except sqlite3.Error:
+                pass  # a failed cache write must not fail the search
+        with self._lock:
+            for i, (normalized, _, future) in enumerate(entries):
+                self._inflight.pop((mode, normalized), None)
+                if results is None:
+                    future.set_exception(error)
+                elif not is_usable(results[i]):
+                    # Not cached; the caller falls back to its own extraction
+                    future.set_exception(ValueError("LLM returned no criteria"))
+                else:
+                    future.set_result(results[i])
+
+
+class ExtractionProxy:
+    """Cache first, then the micro-batched LLM."""
+
+    def __init__(self, cache, client, window_ms=20, max_batch=16, max_inflight=4, timeout=20.0):
+        self.cache = cache
+        self.timeout = timeout
+        self.batcher = MicroBatcher(client, on_results=cache.put_many, window_ms=window_ms,
+                                    max_batch=max_batch, max_inflight=max_inflight)
+
+    def extract(self, mode, prompt):
+        """Returns (criteria dict, cached flag). Raises on upstream failure so
+        the caller can fall back to its own keyword extraction."""
+        if mode not in SYSTEM_PROMPTS:
+            raise ValueError(f"Unknown extraction mode: {mode}")
+        normalized = normalize_prompt(prompt)
+        cached = self.cache.get(mode, normalized)
+        # Older caches may hold empty answers; treat those as misses
+        if is_usable(cached):
+            return cached, True
+        return self.batcher.submit(mode, normalized, prompt).result(timeout=self.timeout), False
+
+
+def proxy_from_env():
+    """Builds the proxy from environment variables (see "AI Service" in README.md)."""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    cache = ExtractionCache(os.environ.get(
+        "EXTRACTION_CACHE_PATH", os.path.join(base_dir, "data", "extraction_cache.sqlite3")))
+    client = LlmClient(
+        endpoint=os.environ.get("LLM_ENDPOINT", GEMINI_ENDPOINT),
+        api_key=os.environ.get("GEMINI_API_KEY"),
+    )
+    return ExtractionProxy(
+        cache,
+        client,
+        window_ms=int(os.environ.get("EXTRACTION_BATCH_WINDOW_MS", "20")),
+        max_batch=int(os.environ.get("EXTRACTION_BATCH_MAX", "16")),
+        max_inflight=int(os.environ.get("EXTRACTION_MAX_INFLIGHT", "4")),
+    )
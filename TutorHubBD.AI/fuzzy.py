@@ -0,0 +1,284 @@
+# Typo-tolerant vocabulary lookup (SymSpell-style symmetric delete index)
+#
+# The web app's fallback uses promptLower.Contains(...), so "mathmatics",
+# "chemestry", "Dhanmondy" or "Uttra" match nothing. Here every vocabulary
+# term is expanded once into all of its deletions up to max_distance; at query
+# time we generate the deletions of each token and look them up in a dict, so
+# resolving a term costs a handful of hash lookups instead of an edit-distance
+# scan over the whole vocabulary.
+
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+
+import vocabulary
+
+# Bump when the on-disk layout changes so stale files are rebuilt
+INDEX_FORMAT = 2
+
+# Common prompt words that should never be "corrected" into a vocabulary term
+STOPWORDS = {
+    "need", "needs", "want", "looking", "for", "a", "an", "the", "in", "at", "of",
+    "and", "or", "to", "my", "me", "i", "we", "our", "who", "with", "near",
+    "tutor", "tutors", "teacher", "teachers", "job", "jobs", "tuition", "student",
+    "son", "daughter", "child", "please", "can", "teach", "teaches", "is", "be",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9\-]+")
+DIGITS_RE = re.compile(r"\d+")
+
+# Short keywords are everyday words ("home", "good", "best"): one edit away
+# is usually a different word ("some", "food", "test"), not a typo. Longer
+# ones ("patient", "experienced") stay typo-tolerant.
+KEYWORD_MIN_FUZZY_LENGTH = 6
+
+
+def allowed_distance(term_length, max_distance):
+    """Short terms must match exactly or nearly: "ict" -> "act" is not a typo we want to fix."""
+    if term_length <= 3:
+        return 0
+    if term_length <= 5:
+        return min(1, max_distance)
+    return max_distance
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment (Damerau-Levenshtein) distance, or limit + 1 if it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[len(b)]
+
+
+def deletes(word, distance):
+    """All strings reachable from word by removing up to `distance` characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        result |= nxt
+        frontier = nxt
+    return result
+
+
+class SymSpellIndex:
+    """Symmetric delete dictionary over (term, kind, canonical value) entries."""
+
+    def __init__(self, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.entries = []      # [(term, kind, canonical)]
+        self.deletes = {}      # delete string -> [entry index]
+        self.max_words = 1
+
+    def add(self, term, kind, canonical=None):
+        term = term.lower().strip()
+        if not term:
+            return
+        index = len(self.entries)
+        self.entries.append((term, kind, canonical if canonical is not None else term))
+        self.max_words = max(self.max_words, len(term.split()))
+        key = term[: self.prefix_length]
+        for d in deletes(key, allowed_distance(len(term), self.max_distance)):
+            self.deletes.setdefault(d, []).append(index)
+
+    def lookup(self, text, kinds=None, limit=5):
+        """Returns [(canonical, kind, term, distance)] ordered by distance."""
+        text = text.lower().strip()
+        max_d = allowed_distance(len(text), self.max_distance)
+        key = text[: self.prefix_length]
+        seen = set()
+        matches = []
+        for d in deletes(key, max_d):
+            for index in self.deletes.get(d, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                term, kind, canonical = self.entries[index]
+                if kinds and kind not in kinds:
+                    continue
+                # Numbers are never typos: "class 11" is not "class 10"
+                if DIGITS_RE.findall(text) != DIGITS_RE.findall(term):
+                    continue
+                limit_d = min(max_d, allowed_distance(len(term), self.max_distance))
+                if kind == "keyword" and len(term) < KEYWORD_MIN_FUZZY_LENGTH:
+                    limit_d = 0
+                dist = edit_distance(text, term, limit_d)
+                if dist <= limit_d:
+                    matches.append((canonical, kind, term, dist))
+        matches.sort(key=lambda m: (m[3], abs(len(m[2]) - len(text))))
+        return matches[:limit]
+
+    def resolve(self, text, kinds=None):
+        """Best single match for a phrase, or None."""
+        found = self.lookup(text, kinds=kinds, limit=1)
+        return found[0] if found else None
+
+    def scan(self, prompt, kinds=None):
+        """Greedily resolves the longest n-grams of a prompt against the vocabulary.
+
+        Returns [(canonical, kind, matched text, distance)] in prompt order."""
+        tokens = TOKEN_RE.findall(prompt.lower())
+        results = []
+        i = 0
+        while i < len(tokens):
+            hit = None
+            for n in range(min(self.max_words, len(tokens) - i), 0, -1):
+                phrase = " ".join(tokens[i:i + n])
+                if n == 1 and phrase in STOPWORDS:
+                    break
+                match = self.resolve(phrase, kinds=kinds)
+                # "a patient" must not fuzzily become "patient", but "a level" is a real term
+                edge_stopword = n > 1 and (tokens[i] in STOPWORDS or tokens[i + n - 1] in STOPWORDS)
+                if match and edge_stopword and match[3] > 0:
+                    match = None
+                if match:
+                    hit = (match[0], match[1], phrase, match[3])
+                    i += n
+                    break
+            if hit:
+                results.append(hit)
+            else:
+                i += 1
+        return results
+
+    def save(self, path, fingerprint, tutor_names=()):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # A private temp file per writer: several workers may save at once, and
+        # os.replace makes whichever finishes last the complete, visible copy
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({
+                    "format": INDEX_FORMAT,
+                    "fingerprint": fingerprint,
+                    "tutor_names": sorted(set(tutor_names)),
+                    "max_distance": self.max_distance,
+                    "prefix_length": self.prefix_length,
+                    "entries": self.entries,
+                    "deletes": self.deletes,
+                    "max_words": self.max_words,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, fingerprint):
+        """Loads a persisted index, or returns None if it is missing or stale."""
+        data = _read(path)
+        if data is None or data.get("fingerprint") != fingerprint:
+            return None
+        index = cls(data["max_distance"], data["prefix_length"])
+        index.entries = data["entries"]
+        index.deletes = data["deletes"]
+        index.max_words = data["max_words"]
+        return index
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT:
+        return None
+    return data
+
+
+def persisted_tutor_names(path):
+    """Tutor names the persisted index was last built with, so a restarted
+    worker can rebuild the same index (and reuse the file) before the next push."""
+    data = _read(path)
+    return list(data.get("tutor_names", ())) if data else []
+
+
+def vocabulary_terms(tutor_names=()):
+    """Every (term, kind, canonical) the index should know about."""
+    terms = []
+    terms += [(s, "subject", vocabulary.SUBJECT_ALIASES.get(s, s)) for s in vocabulary.SUBJECTS]
+    terms += [(alias, "class", canonical) for alias, canonical in vocabulary.CLASS_LEVELS.items()]
+    terms += [(c, "city", c) for c in vocabulary.CITIES]
+    terms += [(a, "area", a) for a in vocabulary.AREAS]
+    terms += [(alias, "medium", canonical) for alias, canonical in vocabulary.MEDIUMS.items()]
+    terms += [(k, "keyword", k) for k in sorted(set(vocabulary.TUTOR_KEYWORDS + vocabulary.JOB_KEYWORDS))]
+    terms += [(name, "tutor", name) for name in sorted(set(tutor_names)) if name]
+    return terms
+
+
+def build_index(tutor_names=(), cache_path=None):
+    """Builds the index for the current vocabulary, reusing the persisted copy when it is up to date."""
+    terms = vocabulary_terms(tutor_names)
+    fingerprint = hashlib.sha1(repr(terms).encode("utf-8")).hexdigest()
+    if cache_path:
+        cached = SymSpellIndex.load(cache_path, fingerprint)
+        if cached is not None:
+            return cached
+    index = SymSpellIndex()
+    for term, kind, canonical in terms:
+        index.add(term, kind, canonical)
+    if cache_path:
+        index.save(cache_path, fingerprint, tutor_names)
+    return index
+
+
+def parse_prompt(index, prompt, mode="tutor"):
+    """Typo-tolerant version of the web app's fallback extractor.
+
+    Returns (criteria dict in the same shape as /extract, list of corrections)."""
+    criteria = {"Subject": None, "ClassLevel": None, "Location": None, "Keywords": []}
+    if mode == "job":
+        criteria.update({"City": None, "Medium": None, "MinSalary": None, "MaxSalary": None})
+    else:
+        criteria["GenderPreference"] = None
+
+    corrections = []
+    for canonical, kind, matched, distance in index.scan(prompt):
+        if distance:
+            corrections.append({"input": matched, "corrected": canonical, "kind": kind, "distance": distance})
+        if kind == "subject" and not criteria["Subject"]:
+            criteria["Subject"] = canonical
+        elif kind == "class" and not criteria["ClassLevel"]:
+            criteria["ClassLevel"] = canonical
+        elif kind == "city" and mode == "job" and not criteria["City"]:
+            criteria["City"] = canonical
+        elif kind in ("area", "city") and not criteria["Location"]:
+            criteria["Location"] = canonical
+        elif kind == "medium" and mode == "job" and not criteria["Medium"]:
+            criteria["Medium"] = canonical
+        elif kind == "keyword" and canonical not in criteria["Keywords"]:
+            criteria["Keywords"].append(canonical)
+
+    lower = prompt.lower()
+    if mode == "job":
+        salary = re.search(r"(\d{4,5})\s*(tk|taka|bdt)?", lower)
+        if salary:
+            criteria["MinSalary"] = int(salary.group(1))
+    else:
+        words = set(TOKEN_RE.findall(lower))
+        if words & {"female", "woman", "lady"}:
+            criteria["GenderPreference"] = "Female"
+        elif words & {"male", "man", "sir"}:
+            criteria["GenderPreference"] = "Male"
+    return criteria, corrections
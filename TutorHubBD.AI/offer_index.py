@@ -0,0 +1,83 @@
+# In-memory offer index behind /recommend/jobs
+#
+# Holds the offers pushed by the web app (/index/offers, /offers), the job
+# ranker and the near-duplicate index, so reposted jobs can be collapsed
+# before a teacher ever sees them. Only open offers are kept: deleting,
+# filling or closing an offer removes it (DELETE / PATCH /offers/<id>).
+
+import threading
+
+from dedup import find_duplicate_groups
+from ranking import JobRanker, is_open
+
+
+class OfferIndex:
+    def __init__(self, offers=()):
+        # Last copy of a repeated Id wins, as with add()
+        self.offers = {o["Id"]: o for o in offers if o.get("Id") is not None and is_open(o)}
+        offers = list(self.offers.values())
+        self.duplicates = find_duplicate_groups(offers)
+        self.ranker = JobRanker(offers)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.offers)
+
+    def add(self, offer):
+        """Indexes a newly created (or re-sent) offer; returns the ID it duplicates, if any."""
+        self.remove(offer["Id"])
+        if not is_open(offer):
+            return None
+        original = self.duplicates.add(offer)
+        with self._lock:
+            self.offers[offer["Id"]] = offer
+            self.ranker.add(offer)
+        return original
+
+    def remove(self, offer_id):
+        """Takes a deleted, filled or closed offer out of ranking and duplicate clusters."""
+        with self._lock:
+            if self.offers.pop(offer_id, None) is None:
+                return False
+            self.ranker.remove(offer_id)
+        self.duplicates.remove(offer_id)
+        return True
+
+    def update_status(self, offer_id, status):
+        """Only open offers are indexed, so any other status removes the offer.
+        A re-opened offer has to be re-sent in full to /offers."""
+        if is_open({"Status": status}):
+            return False
+        return self.remove(offer_id)
+
+    def recommend(self, criteria, prompt=None, limit=20, collapse=True):
+        """Ranked open offers. With collapse, each cluster of near-duplicates is
+        shown once, at its best-ranked member, listing the hidden reposts."""
+        ranked = self.ranker.rank(criteria, prompt)
+
+        results, seen = [], {}
+        for job_id in ranked:
+            cluster = self.duplicates.canonical(job_id)
+            if collapse and cluster in seen:
+                seen[cluster]["DuplicateIds"].append(job_id)
+                continue
+            job = self.offers[job_id]
+            result = {
+                "JobId": job_id,
+                "Title": job.get("Title"),
+                "Subject": job.get("Subject"),
+                "StudentClass": job.get("StudentClass"),
+                "City": job.get("City"),
+                "Location": job.get("Location"),
+                "Medium": job.get("Medium"),
+                "Salary": job.get("Salary"),
+                "DaysPerWeek": job.get("DaysPerWeek"),
+                "CreatedAt": job.get("CreatedAt"),
+                "Rank": len(results) + 1,
+                "DuplicateIds": [],
+            }
+            seen[cluster] = result
+            results.append(result)
+            if len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,164 @@
+# /recommend query log, popular-query sketch and index pre-warming
+#
+# Every /recommend call is appended, normalized, with its latency to a small
+# rotating JSON-lines log (off the request thread, through a QueueHandler).
+# A Space-Saving sketch keeps the most frequent queries in bounded memory and
+# is reloaded from the log on startup, so after a deploy or an index swap the
+# top queries can be replayed against the new index in a background thread
+# before the service reports itself ready.
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from schedule import parse_schedule
+
+
+def normalize_text(value):
+    return " ".join(value.lower().split()) if isinstance(value, str) else value
+
+
+def normalize_query(criteria, schedule="", limit=20, prompt=None):
+    """Canonical form of a /recommend request. Matching is case-insensitive
+    everywhere, so case and spacing differences are the same query.
+
+    Free-text prompts are almost all unique, so the prompt is only part of the
+    query when it decided the results (TutorIndex.search's broad fallback)."""
+    norm = normalize_text
+    clean = {}
+    for field, value in (criteria or {}).items():
+        if isinstance(value, list):
+            value = sorted(norm(v) for v in value if v)
+        else:
+            value = norm(value)
+        if value not in (None, "", []):
+            clean[field] = value
+    query = {"criteria": clean, "schedule": norm(schedule or ""), "limit": limit}
+    if prompt:
+        query["prompt"] = norm(prompt)
+    return query
+
+
+def query_key(query):
+    return json.dumps(query, sort_keys=True, separators=(",", ":"))
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters (Metwally et al. 2005).
+
+    Tracks at most `capacity` keys; a new key evicts one of the least counted
+    and inherits its count, which is recorded as the key's maximum overestimate.
+    Keys are kept in buckets by count (the paper's Stream-Summary), so an
+    update is O(1) however large the capacity."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.buckets = {}  # count -> {key: None}, insertion-ordered
+        self.min_count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _move(self, key, old, new):
+        if old:
+            bucket = self.buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[old]
+                if old == self.min_count:
+                    self.min_count = new
+        self.buckets.setdefault(new, {})[key] = None
+        self.counts[key] = new
+
+    def update(self, key):
+        with self._lock:
+            count = self.counts.get(key)
+            if count is not None:
+                self._move(key, count, count + 1)
+            elif len(self.counts) < self.capacity:
+                self.errors[key] = 0
+                self._move(key, 0, 1)
+                self.min_count = 1
+            else:
+                floor = self.min_count
+                victim = next(iter(self.buckets[floor]))
+                del self.buckets[floor][victim]
+                del self.counts[victim]
+                del self.errors[victim]
+                if not self.buckets[floor]:
+                    del self.buckets[floor]
+                    self.min_count = floor + 1
+                self.errors[key] = floor
+                self._move(key, 0, floor + 1)
+
+    def top(self, n):
+        """[(key, count, error)], most frequent first."""
+        with self._lock:
+            out = []
+            for count in sorted(self.buckets, reverse=True):
+                for key in self.buckets[count]:
+                    out.append((key, count, self.errors[key]))
+                    if len(out) >= n:
+                        return out
+            return out
+
+
+class QueryLog:
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3, capacity=1000):
+        self.path = path
+        self.backups = backups
+        self.popular = SpaceSaving(capacity)
+        self._load()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                       encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+        self._logger = logging.getLogger(f"querylog.{path}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.handlers = [logging.handlers.QueueHandler(self._queue)]
+
+    def _load(self):
+        """Rebuilds the sketch from the log files left by previous runs, oldest first."""
+        files = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]
+        for name in files:
+            if not os.path.exists(name):
+                continue
+            with open(name, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.popular.update(query_key(json.loads(line)["q"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue  # a line cut short by a crash
+
+    def record(self, query, latency_ms):
+        self.popular.update(query_key(query))
+        self._logger.info(json.dumps({"t": int(time.time()), "q": query, "ms": round(latency_ms, 2)},
+                                     separators=(",", ":")))
+
+    def top(self, n):
+        return [(json.loads(key), count, error) for key, count, error in self.popular.top(n)]
+
+    def close(self):
+        self._listener.stop()
+
+
+def prewarm(index, queries):
+    """Runs the queries against the index so its result cache is hot; returns how many ran.
+
+    Sequential on purpose: ranking is pure-Python CPU work, so extra threads
+    would only contend for the GIL with the request threads."""
+    for query in queries:
+        schedule = parse_schedule(query["schedule"]) if query.get("schedule") else None
+        index.search(query["criteria"], query.get("prompt"), schedule, query.get("limit", 20))
+    return len(queries)
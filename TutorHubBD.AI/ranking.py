@@ -0,0 +1,221 @@
+# Tutor and job ranking engines
+#
+# CSharpRanker is a faithful port of AiSearchService.SearchTutorsAsync in the
+# web app (same filters, same weights, same broad fallback), so ranking
+# changes made here can be measured against what production does today.
+# JobRanker does the same for SearchJobsAsync.
+# New engines only need a constructor taking the tutor records and
+# rank(criteria, prompt) / rank_scored(criteria, prompt) methods; register
+# them in RANKERS. TutorIndex uses the scores to weigh in schedule fit.
+#
+# Tutor records use the column names of the Tutors table (TutorID, Subjects,
+# PreferredClasses, ...), criteria use the extractor's field names (Subject,
+# ClassLevel, Location, Keywords).
+
+import re
+from datetime import datetime, timedelta, timezone
+
+# UTC offset after a time of day ("10:00:00.1234567+06:00", "10:00Z")
+_OFFSET_RE = re.compile(r"(?<=\d)\s*(Z|[+-]\d{2}:?\d{2})$")
+
+
+def _naive_local(value):
+    # Everything is compared with datetime.now(), so aware values become naive local time
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def parse_datetime(value):
+    """Accepts datetimes, ISO / SQL Server export strings and System.Text.Json
+    DateTime values ("2026-01-05T10:00:00.1234567+06:00"); None for empty values.
+    Always returns a naive local datetime."""
+    if value in (None, "", "NULL"):
+        return None
+    if isinstance(value, datetime):
+        return _naive_local(value)
+    text = str(value).strip().replace("T", " ")
+
+    tz = None
+    offset = _OFFSET_RE.search(text)
+    if offset:
+        text = text[:offset.start()].rstrip()
+        if offset.group(1) == "Z":
+            tz = timezone.utc
+        else:
+            sign = -1 if offset.group(1)[0] == "-" else 1
+            digits = offset.group(1)[1:].replace(":", "")
+            tz = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+    # .NET and SQL Server write 7 fractional digits; datetime takes at most 6
+    if "." in text:
+        head, frac = text.split(".", 1)
+        text = f"{head}.{frac[:6]}"
+    parsed = datetime.fromisoformat(text)
+    return _naive_local(parsed.replace(tzinfo=tz)) if tz else parsed
+
+
+def _contains(haystack, needle):
+    return bool(haystack) and needle.lower() in haystack.lower()
+
+
+def tutor_match_score(tutor, criteria):
+    """Same weights as AiSearchService.CalculateTutorMatchScore."""
+    score = 0
+    if criteria.get("Subject") and _contains(tutor.get("Subjects"), criteria["Subject"]):
+        score += 30
+    if criteria.get("ClassLevel") and _contains(tutor.get("PreferredClasses"), criteria["ClassLevel"]):
+        score += 25
+    if criteria.get("Location") and _contains(tutor.get("PreferredLocations"), criteria["Location"]):
+        score += 20
+
+    keywords = criteria.get("Keywords") or []
+    if keywords and tutor.get("Bio"):
+        score += sum(1 for k in keywords if _contains(tutor["Bio"], k)) * 5
+
+    if tutor.get("IsVerified"):
+        score += 10
+    score += int((tutor.get("Rating") or 0) * 2)
+    if tutor.get("Experience") is not None:
+        score += min(tutor["Experience"], 10)
+    return score
+
+
+def broad_tutor_score(tutor, words):
+    """Same as AiSearchService.CalculateBroadTutorScore."""
+    text = " ".join(str(tutor.get(f) or "") for f in
+                    ("Subjects", "PreferredClasses", "PreferredLocations", "Bio", "Education")).lower()
+    return sum(1 for w in words if w in text) * 5
+
+
+class CSharpRanker:
+    """The current production ranking: hard filters on subject/class/location, then score."""
+
+    name = "csharp"
+    hard_filters = True
+
+    def __init__(self, tutors):
+        # Only verified tutors with complete profiles are searchable
+        self.tutors = [t for t in tutors if t.get("IsVerified") and t.get("IsProfileComplete")]
+
+    def _passes_filters(self, tutor, criteria):
+        for field, column in (("Subject", "Subjects"), ("ClassLevel", "PreferredClasses"), ("Location", "PreferredLocations")):
+            if criteria.get(field) and not _contains(tutor.get(column), criteria[field]):
+                return False
+        return True
+
+    def rank(self, criteria, prompt=None):
+        """Returns tutor IDs, best first."""
+        return [tutor_id for tutor_id, _ in self.rank_scored(criteria, prompt)]
+
+    def rank_scored(self, criteria, prompt=None):
+        """[(tutor ID, score)], best first; equal scores are ordered by rating."""
+        candidates = self.tutors
+        if self.hard_filters:
+            candidates = [t for t in candidates if self._passes_filters(t, criteria)]
+
+        scored = [(tutor_match_score(t, criteria), t.get("Rating") or 0, t["TutorID"]) for t in candidates]
+        scored.sort(key=lambda s: (-s[0], -s[1]))
+        if scored or not prompt:
+            return [(tutor_id, score) for score, _, tutor_id in scored]
+        return self._broad_search(prompt)
+
+    def _broad_search(self, prompt):
+        words = [w for w in prompt.lower().split() if len(w) > 2]
+        scored = [(broad_tutor_score(t, words), t["TutorID"]) for t in self.tutors]
+        scored = [s for s in scored if s[0] > 0]
+        scored.sort(key=lambda s: -s[0])
+        return [(tutor_id, score) for score, tutor_id in scored[:20]]
+
+
+class SoftFilterRanker(CSharpRanker):
+    """Same weights, but criteria only boost the score instead of excluding tutors."""
+
+    name = "soft"
+    hard_filters = False
+
+
+RANKERS = {cls.name: cls for cls in (CSharpRanker, SoftFilterRanker)}
+
+
+def is_open(offer):
+    # JobStatus.Open serializes as 0, or as "Open" with a string enum converter
+    return offer.get("Status", 0) in (0, "0", "Open", None)
+
+
+def job_match_score(job, criteria, now=None):
+    """Same weights as AiSearchService.CalculateJobMatchScore."""
+    score = 0
+    if criteria.get("Subject"):
+        text = f'{job.get("Title") or ""} {job.get("Description") or ""} {job.get("Subject") or ""}'
+        if _contains(text, criteria["Subject"]):
+            score += 30
+    if criteria.get("ClassLevel") and _contains(job.get("StudentClass"), criteria["ClassLevel"]):
+        score += 25
+    if criteria.get("City") and _contains(job.get("City"), criteria["City"]):
+        score += 20
+    if criteria.get("Location") and _contains(job.get("Location"), criteria["Location"]):
+        score += 15
+    if criteria.get("Medium") and _contains(job.get("Medium"), criteria["Medium"]):
+        score += 10
+
+    score += int(job.get("Salary") or 0) // 500
+
+    created = parse_datetime(job.get("CreatedAt"))
+    if created is not None:
+        days = ((now or datetime.now()) - created).days
+        if days <= 7:
+            score += 10
+        elif days <= 14:
+            score += 5
+
+    keywords = criteria.get("Keywords") or []
+    if keywords and job.get("Description"):
+        score += sum(1 for k in keywords if _contains(job["Description"], k)) * 5
+    return score
+
+
+class JobRanker:
+    """Port of AiSearchService.SearchJobsAsync: open offers, hard filters, then score."""
+
+    FILTERS = (("City", "City"), ("Location", "Location"), ("ClassLevel", "StudentClass"), ("Medium", "Medium"))
+
+    def __init__(self, offers):
+        # Newest first, as the web app orders the query before scoring
+        self.offers = sorted((o for o in offers if is_open(o)),
+                             key=lambda o: parse_datetime(o.get("CreatedAt")) or datetime.min, reverse=True)
+
+    def add(self, offer):
+        """A just-created offer is the newest one, so it goes to the front."""
+        self.remove(offer["Id"])
+        if is_open(offer):
+            self.offers.insert(0, offer)
+
+    def remove(self, offer_id):
+        self.offers = [o for o in self.offers if o["Id"] != offer_id]
+
+    def _passes_filters(self, job, criteria):
+        for field, column in self.FILTERS:
+            if criteria.get(field) and not _contains(job.get(column), criteria[field]):
+                return False
+        if criteria.get("MinSalary") is not None and (job.get("Salary") or 0) < criteria["MinSalary"]:
+            return False
+        return True
+
+    def rank(self, criteria, prompt=None):
+        """Returns offer IDs, best first."""
+        now = datetime.now()
+        scored = [(job_match_score(j, criteria, now), j.get("Salary") or 0, j["Id"])
+                  for j in self.offers if self._passes_filters(j, criteria)]
+        scored.sort(key=lambda s: (-s[0], -s[1]))
+        if scored or not prompt:
+            return [job_id for _, _, job_id in scored]
+
+        words = [w for w in prompt.lower().split() if len(w) > 2]
+        broad = []
+        for j in self.offers:
+            text = " ".join(str(j.get(f) or "") for f in
+                            ("Title", "Description", "Subject", "City", "Location", "StudentClass")).lower()
+            hits = sum(1 for w in words if w in text) * 5
+            if hits:
+                broad.append((hits, j.get("Salary") or 0, j["Id"]))
+        broad.sort(key=lambda s: (-s[0], -s[1]))
+        return [job_id for _, _, job_id in broad[:20]]
@@ -0,0 +1,288 @@
+# Market salary estimates from mergeable quantile sketches
+#
+# Guardians pick Salary (1000-50000) blind and teachers set MinSalary without
+# knowing the going rate. We keep one KLL quantile sketch per
+# subject x class x area x medium cell *and* for every coarser roll-up of it
+# (any field replaced by "*"), so an estimate is a lookup plus a quantile
+# read over at most a few hundred retained items, never a GROUP BY over
+# TuitionOffers. Sparse cells back off to coarser roll-ups until there are
+# enough samples. The sketches are saved under AI_DATA_DIR after every
+# update, so a restarted service keeps its estimates.
+
+import math
+import os
+import pickle
+import random
+import tempfile
+import threading
+from itertools import product
+
+import vocabulary
+
+FIELDS = ("subject", "class", "area", "medium")
+ANY = "*"
+
+# Which fields to give up first when a cell is too sparse
+BACKOFF_ORDER = ("medium", "area", "class", "subject")
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+MIN_SAMPLES = 10
+
+# Bump when the on-disk layout changes so stale files are ignored
+SALARY_FORMAT = 1
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Level h holds items of weight 2**h. When the sketch is full, the lowest
+    over-capacity level is sorted and every other item is promoted to the
+    next level. Two sketches merge by concatenating levels and compacting,
+    which is what lets roll-up cells be built from their children."""
+
+    def __init__(self, k=200, c=2.0 / 3.0, seed=None):
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.compactors = []
+        self.max_size = 0
+        self._rng = random.Random(seed)
+        self._sorted = None  # cached (values, cumulative weights) for quantile reads
+        self._grow()
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _size(self):
+        return sum(len(c) for c in self.compactors)
+
+    def _compress(self):
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 >= len(self.compactors):
+                    self._grow()
+                level.sort()
+                # Keep the odd item out (if any) at this level
+                leftover = [level.pop()] if len(level) % 2 else []
+                offset = self._rng.randint(0, 1)
+                self.compactors[h + 1].extend(level[offset::2])
+                self.compactors[h] = leftover
+                if self._size() < self.max_size:
+                    break
+
+    def update(self, value):
+        self.compactors[0].append(value)
+        self.count += 1
+        self._sorted = None
+        if self._size() >= self.max_size:
+            self._compress()
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.count += other.count
+        self._sorted = None
+        while self._size() >= self.max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Values at fractions qs (0..1)."""
+        if not self.count:
+            return [None for _ in qs]
+        if self._sorted is None:
+            weighted = sorted((v, 1 << h) for h, level in enumerate(self.compactors) for v in level)
+            values, cumulative, total = [], [], 0
+            for v, w in weighted:
+                total += w
+                values.append(v)
+                cumulative.append(total)
+            self._sorted = (values, cumulative)
+        values, cumulative = self._sorted
+        total = cumulative[-1]
+        out = []
+        for q in qs:
+            target = q * total
+            # First retained item whose cumulative weight reaches the target
+            lo, hi = 0, len(cumulative) - 1
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if cumulative[mid] < target:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            out.append(values[lo])
+        return out
+
+
+def normalize_cell(subject=None, student_class=None, area=None, medium=None):
+    """Canonical (subject, class, area, medium) key; missing fields become "*"."""
+    def norm(value):
+        value = " ".join(str(value or "").lower().split())
+        return value or ANY
+
+    subject = norm(subject)
+    subject = vocabulary.SUBJECT_ALIASES.get(subject, subject)
+    return (subject, norm(student_class), norm(area), norm(medium))
+
+
+def _canonical(index, texts, kinds):
+    """First vocabulary term of the given kinds found in the texts, tried in order."""
+    for text in texts:
+        if text and text.strip():
+            found = index.scan(text, kinds=kinds)
+            if found:
+                return found[0][0]
+    return None
+
+
+def query_cell(index, subject=None, student_class=None, area=None, medium=None):
+    """Cell for free-form query values, canonicalized like offer_cell.
+    Values the vocabulary doesn't know become "*"."""
+    return normalize_cell(
+        _canonical(index, (subject,), {"subject"}),
+        _canonical(index, (student_class,), {"class"}),
+        _canonical(index, (area,), {"area", "city"}),
+        _canonical(index, (f"{medium} medium" if medium else None,), {"medium"}),
+    )
+
+
+def offer_cell(offer, index):
+    """Cell of a TuitionOffer record.
+
+    The web app stores Subject as "General" and Location as free text
+    ("Mirpur 10"), so every field is resolved against the fuzzy vocabulary
+    index, falling back to the Title and Description."""
+    text = f'{offer.get("Title") or ""} {offer.get("Description") or ""}'
+    return normalize_cell(
+        _canonical(index, (offer.get("Subject"), text), {"subject"}),
+        _canonical(index, (offer.get("StudentClass"), text), {"class"}),
+        _canonical(index, (offer.get("Location"), text), {"area", "city"}),
+        _canonical(index, (f'{offer["Medium"]} medium' if offer.get("Medium") else None, text), {"medium"}),
+    )
+
+
+def rollups(cell):
+    """The cell itself and every coarser cell above it (fields replaced by "*")."""
+    options = [(value, ANY) if value != ANY else (ANY,) for value in cell]
+    return set(product(*options))
+
+
+class SalaryIndex:
+    def __init__(self, k=200):
+        self.k = k
+        self.sketches = {}
+        # Every offer counts once, even when it is re-sent after being
+        # edited, filled or closed
+        self.offer_ids = set()
+        # Offers arrive on request threads while estimates are being read
+        self._lock = threading.Lock()
+
+    def _sketch(self, cell):
+        sketch = self.sketches.get(cell)
+        if sketch is None:
+            sketch = self.sketches[cell] = KLLSketch(self.k)
+        return sketch
+
+    def add(self, cell, salary, offer_id=None):
+        """Incremental update when an offer is created: the cell and all its roll-ups.
+        Returns False (and counts nothing) for an offer that was already counted."""
+        with self._lock:
+            if offer_id is not None:
+                if offer_id in self.offer_ids:
+                    return False
+                self.offer_ids.add(offer_id)
+            for key in rollups(cell):
+                self._sketch(key).update(salary)
+            return True
+
+    @classmethod
+    def build(cls, offers, k=200, offer_ids=()):
+        """Bulk load: fill the finest cells, then merge them up into the roll-ups."""
+        index = cls(k)
+        index.offer_ids = set(offer_ids)
+        leaves = {}
+        for cell, salary in offers:
+            sketch = leaves.get(cell)
+            if sketch is None:
+                sketch = leaves[cell] = KLLSketch(k)
+            sketch.update(salary)
+        for cell, sketch in leaves.items():
+            for key in rollups(cell):
+                index._sketch(key).merge(sketch)
+        return index
+
+    def save(self, path):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Private temp file per writer, then an atomic replace (as fuzzy.SymSpellIndex.save)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, self._lock:
+                pickle.dump({
+                    "format": SALARY_FORMAT,
+                    "k": self.k,
+                    "sketches": self.sketches,
+                    "offer_ids": self.offer_ids,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Loads saved sketches, or returns None if the file is missing or stale."""
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if not isinstance(data, dict) or data.get("format") != SALARY_FORMAT:
+            return None
+        index = cls(data["k"])
+        index.sketches = data["sketches"]
+        index.offer_ids = data["offer_ids"]
+        return index
+
+    def estimate(self, cell, percentiles=DEFAULT_PERCENTILES, min_samples=MIN_SAMPLES):
+        """Percentile bands for the most specific cell with at least min_samples
+        offers, backing off one field at a time in BACKOFF_ORDER."""
+        key = list(cell)
+        candidates = [tuple(key)]
+        for field in BACKOFF_ORDER:
+            i = FIELDS.index(field)
+            if key[i] != ANY:
+                key[i] = ANY
+                candidates.append(tuple(key))
+
+        with self._lock:
+            return self._estimate(cell, candidates, percentiles, min_samples)
+
+    def _estimate(self, cell, candidates, percentiles, min_samples):
+        chosen = None
+        for candidate in candidates:
+            sketch = self.sketches.get(candidate)
+            if sketch is not None and sketch.count >= min_samples:
+                chosen = candidate
+                break
+        if chosen is None:
+            # Not enough data anywhere; report the coarsest level we have at all
+            chosen = next((c for c in reversed(candidates) if c in self.sketches), candidates[-1])
+
+        sketch = self.sketches.get(chosen)
+        values = sketch.quantiles([p / 100.0 for p in percentiles]) if sketch else [None] * len(percentiles)
+        return {
+            "cell": dict(zip(FIELDS, chosen)),
+            "exact": chosen == tuple(cell),
+            "samples": sketch.count if sketch else 0,
+            "percentiles": {f"p{p}": v for p, v in zip(percentiles, values)},
+        }
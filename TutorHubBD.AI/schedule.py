@@ -0,0 +1,224 @@
+# Weekly schedule bitsets for availability-aware matching
+#
+# TuitionOffer.DaysPerWeek is free text ("3 days, Sun Tue Thu evening",
+# "Sat-Mon 4-6pm", "weekends") and tutors have no structured availability at
+# all. Both are parsed here into a 56-bit mask that fits in one uint64:
+#   byte d (d = 0..6, Saturday first as in the Bangladeshi week) = day d
+#   bit  s (s = 0..7) of that byte = 2-hour slot starting at 07:00 + 2*s
+# Compatibility of one offer against every tutor is then a vectorized
+# popcount(offer & tutors) over a numpy uint64 array.
+
+import re
+
+import numpy as np
+
+DAYS = ["sat", "sun", "mon", "tue", "wed", "thu", "fri"]
+DAY_ALIASES = {
+    "saturday": 0, "sat": 0,
+    "sunday": 1, "sun": 1,
+    "monday": 2, "mon": 2,
+    "tuesday": 3, "tues": 3, "tue": 3,
+    "wednesday": 4, "wed": 4,
+    "thursday": 5, "thurs": 5, "thu": 5,
+    "friday": 6, "fri": 6,
+}
+
+SLOTS_PER_DAY = 8
+FIRST_HOUR = 7
+SLOT_HOURS = 2
+
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+ALL_SLOTS = sum(DAY_MASK << (8 * d) for d in range(7))
+
+# Slot indexes for the usual ways people describe a time of day
+PERIODS = {
+    "morning": (0, 1),
+    "noon": (2,),
+    "afternoon": (3, 4),
+    "evening": (5, 6),
+    "night": (6, 7),
+}
+
+_DAY_WORD = r"(saturday|sunday|monday|tuesday|wednesday|thursday|friday|sat|sun|mon|tues|tue|wed|thurs|thu|fri)"
+_DAY_RANGE_RE = re.compile(_DAY_WORD + r"\s*(?:-|to|–)\s*" + _DAY_WORD)
+_DAY_RE = re.compile(r"\b" + _DAY_WORD + r"\b")
+# "except friday", "excluding fri and sat", "friday off", "fri/sat off"
+_DAY_LIST = r"(\b" + _DAY_WORD + r"\b(?:\s*(?:,|and|&|/|or)?\s*\b" + _DAY_WORD + r"\b)*)"
+_EXCLUDED_RES = [
+    re.compile(r"\b(?:except|excluding|but not|other than)\s+" + _DAY_LIST),
+    re.compile(_DAY_LIST + r"\s*(?:off|closed|holiday)\b"),
+]
+# "3 days", "3d", "3-4 days a week" (at least the lower bound), or a bare "3"
+_DAY_COUNT_RE = re.compile(r"(\d)(?:\s*(?:-|to|–)\s*\d)?\s*(?:days?|d)\b|^\s*(\d)\s*$")
+# "4-6pm", "16:00 to 18:00"; not counts like "3-4 days" or "2-3 hours"
+_TIME_RANGE_RE = re.compile(
+    r"(?<!\d)(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:-|to|–)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?(?!\d)"
+    r"(?!\s*(?:days?|d|hours?|hrs?|h|times?)\b)")
+_PERIOD_RES = {word: re.compile(r"\b" + word + r"\b") for word in PERIODS}
+_AFTER_RE = re.compile(r"after\s+(\d{1,2})(?!\d)\s*(am|pm)?")
+
+
+def _to_hour(hour, minute, meridiem):
+    hour = int(hour) % 12 if meridiem else int(hour)
+    if meridiem == "pm" or (meridiem is None and hour < FIRST_HOUR):
+        # Tuition is almost never before 7am, so a bare "4-6" means afternoon
+        hour += 12
+    return hour + int(minute or 0) / 60.0
+
+
+def _slots_between(start, end):
+    slots = set()
+    for s in range(SLOTS_PER_DAY):
+        slot_start = FIRST_HOUR + s * SLOT_HOURS
+        if slot_start < end and slot_start + SLOT_HOURS > start:
+            slots.add(s)
+    return slots
+
+
+def _excluded_days(text):
+    """Days the text rules out, and the text with those mentions removed."""
+    excluded = set()
+    for pattern in _EXCLUDED_RES:
+        for match in pattern.finditer(text):
+            excluded |= {DAY_ALIASES[d] for d in _DAY_RE.findall(match.group(1))}
+        text = pattern.sub(" ", text)
+    return excluded, text
+
+
+def _parse_days(text):
+    """Days the text asks for; "5 days except friday" is every day but Friday."""
+    excluded, text = _excluded_days(text)
+    days = _named_days(text)
+    if excluded:
+        days = (days or set(range(7))) - excluded
+    return days
+
+
+def _named_days(text):
+    if re.search(r"\b(daily|everyday|every day|all days|7 days)\b", text):
+        return set(range(7))
+    days = set()
+    for a, b in _DAY_RANGE_RE.findall(text):
+        start, end = DAY_ALIASES[a], DAY_ALIASES[b]
+        d = start
+        while True:
+            days.add(d)
+            if d == end:
+                break
+            d = (d + 1) % 7
+    days |= {DAY_ALIASES[d] for d in _DAY_RE.findall(text)}
+    if re.search(r"\bweekends?\b", text):
+        days |= {0, 6}
+    if re.search(r"\bweekdays?\b", text):
+        days |= {1, 2, 3, 4, 5}
+    return days
+
+
+def _parse_slots(text):
+    slots = set()
+    for h1, m1, ap1, h2, m2, ap2 in _TIME_RANGE_RE.findall(text):
+        ap1, ap2 = ap1 or None, ap2 or None
+        # "4-6pm": the meridiem on the end applies to the start as well...
+        start = _to_hour(h1, m1, ap1 or ap2)
+        end = _to_hour(h2, m2, ap2 or ap1)
+        if ap2 and not ap1 and start > end:
+            start = _to_hour(h1, m1, None)  # ...unless that flips it past the end: "10-1pm"
+        # A bare end hour follows the start into the afternoon: "5-7", "11am-1"
+        if not ap2 and end < 12 and (start >= 12 or end <= start):
+            end += 12
+        if start < end <= 24:
+            slots |= _slots_between(start, end)
+    for hour, ap in _AFTER_RE.findall(text):
+        slots |= _slots_between(_to_hour(hour, 0, ap or None), 24)
+    for word, period_slots in PERIODS.items():
+        if _PERIOD_RES[word].search(text):
+            slots |= set(period_slots)
+    return slots
+
+
+class Schedule:
+    """A parsed schedule: the slot mask plus how many distinct days are needed.
+
+    "3 days a week" names no particular days, so its mask covers every day and
+    min_days=3 says at least three of them must overlap."""
+
+    __slots__ = ("bits", "min_days")
+
+    def __init__(self, bits, min_days=1):
+        self.bits = bits
+        self.min_days = min_days
+
+    def to_dict(self):
+        return {"bits": self.bits, "min_days": self.min_days, "slots": describe(self.bits)}
+
+
+def parse_schedule(text):
+    """Parses free text into a Schedule. Empty or unparseable text means "any time"."""
+    text = (text or "").lower()
+    days = _parse_days(text)
+    slots = _parse_slots(text) or set(range(SLOTS_PER_DAY))
+
+    count = _DAY_COUNT_RE.search(text)
+    min_days = int(count.group(1) or count.group(2)) if count else 1
+    if not days:
+        days = set(range(7))
+    else:
+        min_days = min(min_days, len(days)) if count else len(days)
+    min_days = max(1, min(min_days, 7))
+
+    day_bits = sum(1 << s for s in slots)
+    bits = sum(day_bits << (8 * d) for d in days)
+    return Schedule(bits, min_days)
+
+
+# Tutors who haven't told us their availability are never filtered out
+ANY_TIME = Schedule(ALL_SLOTS, 1)
+
+
+def describe(bits):
+    """Human-readable form of a mask, e.g. {"sun": ["17:00-19:00"]}."""
+    out = {}
+    for d, name in enumerate(DAYS):
+        day = (bits >> (8 * d)) & DAY_MASK
+        if day:
+            out[name] = [
+                f"{FIRST_HOUR + s * SLOT_HOURS:02d}:00-{FIRST_HOUR + (s + 1) * SLOT_HOURS:02d}:00"
+                for s in range(SLOTS_PER_DAY) if day >> s & 1
+            ]
+    return out
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(values):
+        return np.bitwise_count(values)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        return _POPCOUNT_TABLE[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1)
+
+
+class ScheduleMatrix:
+    """Availability masks of a whole candidate set, aligned with a list of IDs."""
+
+    def __init__(self, ids, schedules):
+        self.ids = list(ids)
+        self.bits = np.fromiter((s.bits for s in schedules), dtype=np.uint64, count=len(self.ids))
+
+    def overlap(self, schedule):
+        """(overlapping slots, overlapping days) per candidate."""
+        shared = self.bits & np.uint64(schedule.bits)
+        slots = popcount(shared)
+        # Each byte is one day; a day overlaps if any of its slots do
+        days = (shared.view(np.uint8).reshape(-1, 8) != 0).sum(axis=1)
+        return slots, days
+
+    def match(self, schedule):
+        """(compatible mask, score) per candidate.
+
+        Compatible means the candidate shares at least min_days days with the
+        schedule; score is the fraction of the requested slots it covers."""
+        slots, days = self.overlap(schedule)
+        wanted = bin(schedule.bits).count("1")
+        scores = slots / wanted if wanted else np.ones(len(self.ids))
+        return days >= schedule.min_days, scores
@@ -0,0 +1,67 @@
+# Local stand-in for the Gemini generateContent API.
+# Lets the extraction proxy be exercised offline without an API key:
+#   python stub_llm.py
+#   LLM_ENDPOINT=http://localhost:5050/v1beta/models/gemini-1.5-flash:generateContent python app.py
+# It answers each numbered query with the same keyword rules as the web app's
+# fallback extractor, tagged with the query number and wrapped in the Gemini
+# response shape.
+
+import json
+import re
+
+from flask import Flask, jsonify, request
+
+import vocabulary
+
+app = Flask(__name__)
+
+# Counters so tests can check how many upstream calls were actually made
+stats = {"requests": 0, "prompts": 0}
+
+
+def extract_rules(query, mode):
+    q = query.lower()
+    criteria = {
+        "Subject": next((s for s in vocabulary.SUBJECTS if s in q), None),
+        "ClassLevel": next((v for k, v in vocabulary.CLASS_LEVELS.items() if k in q), None),
+        "Location": next((a for a in vocabulary.AREAS + vocabulary.CITIES if a in q), None),
+    }
+    if mode == "job":
+        criteria["City"] = next((c for c in vocabulary.CITIES if c in q), None)
+        criteria["Location"] = next((a for a in vocabulary.AREAS if a in q), None)
+        criteria["Medium"] = next((v for k, v in vocabulary.MEDIUMS.items() if k in q), None)
+        salary = re.search(r"(\d{4,5})\s*(tk|taka|bdt)?", q)
+        criteria["MinSalary"] = int(salary.group(1)) if salary else None
+        criteria["MaxSalary"] = None
+        criteria["Keywords"] = [k for k in vocabulary.JOB_KEYWORDS if k in q]
+    else:
+        if "female" in q or "woman" in q or "lady" in q:
+            criteria["GenderPreference"] = "Female"
+        elif "male" in q or " man" in q or "sir" in q:
+            criteria["GenderPreference"] = "Male"
+        else:
+            criteria["GenderPreference"] = None
+        criteria["Keywords"] = [k for k in vocabulary.TUTOR_KEYWORDS if k in q]
+    return criteria
+
+
+@app.route('/v1beta/models/<model>:generateContent', methods=['POST'])
+def generate_content(model):
+    text = request.json["contents"][0]["parts"][0]["text"]
+    mode = "job" if "tuition job matching" in text else "tutor"
+    queries = re.findall(r"^\d+\. (.*)$", text.split("Queries:", 1)[-1], re.MULTILINE)
+
+    stats["requests"] += 1
+    stats["prompts"] += len(queries)
+
+    answer = json.dumps([dict(extract_rules(q, mode), Query=i + 1) for i, q in enumerate(queries)])
+    return jsonify({"candidates": [{"content": {"parts": [{"text": answer}]}}]})
+
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    return jsonify(stats)
+
+
+if __name__ == '__main__':
+    app.run(port=5050, threaded=True)
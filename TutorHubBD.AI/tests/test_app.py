@@ -0,0 +1,126 @@
+"""
+TutorHubBD AI Service - HTTP endpoints
+The app is imported once with its data directory pointed at a temp dir.
+"""
+
+import importlib
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("ai-data")
+    patch = pytest.MonkeyPatch()
+    patch.setenv("AI_DATA_DIR", str(data_dir))
+    patch.setenv("EXTRACTION_CACHE_PATH", str(data_dir / "extraction_cache.sqlite3"))
+    patch.setenv("LLM_ENDPOINT", "http://127.0.0.1:9/unreachable")
+    app = importlib.import_module("app")
+    yield app
+    app.query_log.close()
+    patch.undo()
+
+
+@pytest.fixture
+def client(service):
+    return service.app.test_client()
+
+
+def tutor(i, subject="Math"):
+    return {"TutorID": i, "FullName": f"Tutor {i}", "IsVerified": True, "IsProfileComplete": True,
+            "Subjects": subject, "PreferredLocations": "Mirpur", "Rating": 4}
+
+
+def wait_ready(service, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not service.ready.is_set() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return service.ready.is_set()
+
+
+class TestReadiness:
+    def test_fresh_service_is_ready(self, client):
+        response = client.get('/ready')
+        assert response.status_code == 200
+        assert client.get('/status').json["ready"] is True
+
+    def test_pushed_index_is_warmed_then_ready(self, service, client):
+        client.post('/recommend', json={"criteria": {"Subject": "Math"}})
+        assert client.post('/index/tutors', json={"tutors": [tutor(1), tutor(2, "English")]}).status_code == 200
+        assert wait_ready(service)
+        assert client.get('/ready').status_code == 200
+
+
+class TestPromptValidation:
+    @pytest.mark.parametrize("path", ['/extract', '/parse', '/recommend', '/recommend/jobs'])
+    @pytest.mark.parametrize("prompt", [None, 42, ["math"]])
+    def test_non_string_prompt_is_rejected(self, client, path, prompt):
+        response = client.post(path, json={"prompt": prompt})
+        assert response.status_code == 400
+        assert "prompt" in response.json["error"]
+
+    def test_missing_prompt_still_parses(self, client):
+        assert client.post('/parse', json={}).status_code == 200
+
+
+class TestOffers:
+    def offer(self, i, **fields):
+        return dict({"Id": i, "Title": "Math tutor needed for class 8", "Subject": "Math",
+                     "Location": "Mirpur", "Salary": 5000}, **fields)
+
+    def test_repeated_id_in_bulk_push_can_be_deleted(self, service, client):
+        offers = [self.offer(1), self.offer(1, Salary=6000), self.offer(2, Title="Math tutor needed, class 8")]
+        assert client.post('/index/offers', json={"offers": offers}).json["offers"] == 2
+        assert client.delete('/offers/1').json["removed"] is True
+        response = client.post('/offers', json=self.offer(3, Title="Math tutor needed for class 8!"))
+        assert response.status_code == 200
+
+    def test_resent_offer_counts_salary_once(self, service, client):
+        client.post('/index/offers', json={"offers": []})
+        client.post('/offers', json=self.offer(1))
+        client.post('/offers', json=self.offer(1))
+        assert service.salary_index.estimate(("*", "*", "*", "*"), min_samples=1)["samples"] == 1
+
+    def test_filled_offer_resent_counts_salary_once(self, service, client):
+        client.post('/index/offers', json={"offers": []})
+        client.post('/offers', json=self.offer(1))
+        client.patch('/offers/1', json={"Status": "Filled"})
+        client.post('/offers', json=self.offer(1, Status="Filled"))
+        assert service.salary_index.estimate(("*", "*", "*", "*"), min_samples=1)["samples"] == 1
+        assert os.path.exists(service.SALARY_INDEX_PATH)
+
+    @pytest.mark.parametrize("threshold", ["high", None, 0, 1.5, True])
+    def test_invalid_dedup_threshold_is_rejected(self, client, threshold):
+        assert client.post('/dedup', json={"threshold": threshold}).status_code == 400
+
+
+class TestListBodies:
+    @pytest.mark.parametrize("path, field", [('/vocabulary/tutors', 'tutors'), ('/index/tutors', 'tutors'),
+                                             ('/index/offers', 'offers'), ('/dedup', 'offers')])
+    def test_non_list_is_rejected(self, client, path, field):
+        response = client.post(path, json={field: "abc"})
+        assert response.status_code == 400
+        assert field in response.json["error"]
+
+
+class TestCriteriaValidation:
+    @pytest.mark.parametrize("path, criteria", [
+        ('/recommend', {"Subject": ["math", "physics"]}),
+        ('/recommend', {"Keywords": "patient"}),
+        ('/recommend/jobs', {"Location": 5}),
+        ('/recommend/jobs', {"MinSalary": "5000"}),
+    ])
+    def test_malformed_criteria_are_rejected(self, client, path, criteria):
+        response = client.post(path, json={"criteria": criteria})
+        assert response.status_code == 400
+        assert "criteria." in response.json["error"]
+
+    def test_null_criteria_values_are_allowed(self, client):
+        criteria = {"Subject": "Math", "ClassLevel": None, "Keywords": ["patient"], "MinSalary": None}
+        assert client.post('/recommend/jobs', json={"criteria": criteria}).status_code == 200
+
+    def test_schedule_text_must_be_a_string(self, client):
+        assert client.post('/schedule/parse', json={"text": 5}).status_code == 400
+        assert client.post('/schedule/parse', json={"text": "Sun 4-6pm"}).status_code == 200
@@ -0,0 +1,65 @@
+"""
+TutorHubBD AI Service - Typeahead completions
+Subjects, classes and areas come from the vocabulary; tutor names from the
+pushed Tutors records.
+"""
+
+from autocomplete import MAX_K, MAX_PREFIX, AutocompleteIndex, build_index
+
+
+def tutor(name, rating=4, subjects="Math", verified=True):
+    return {"FullName": name, "Rating": rating, "Subjects": subjects, "IsVerified": verified,
+            "PreferredClasses": "Class 8", "PreferredLocations": "Mirpur"}
+
+
+def texts(completions):
+    return [c.text for c in completions]
+
+
+class TestComplete:
+    def index(self):
+        return build_index([tutor("Syed Rafi", 5), tutor("Rafiq Islam", 3), tutor("Hidden Tutor", verified=False)],
+                           [{"Subject": "Physics", "StudentClass": "Class 8", "Location": "Mirpur"}])
+
+    def test_prefix_match(self):
+        assert "Math" in texts(self.index().complete("mat"))
+        assert texts(self.index().complete("MIR")) == ["Mirpur"]
+
+    def test_tutor_names_match_from_any_word(self):
+        assert texts(self.index().complete("raf", kinds={"tutor"})) == ["Syed Rafi", "Rafiq Islam"]
+        assert texts(self.index().complete("isl")) == ["Rafiq Islam"]
+
+    def test_unverified_tutors_are_not_offered(self):
+        assert self.index().complete("hidden") == []
+
+    def test_kind_filter(self):
+        index = self.index()
+        assert {c.kind for c in index.complete("m", kinds={"area", "city"})} <= {"area", "city"}
+        mixed = index.complete("m", k=MAX_K, kinds={"subject", "area"})
+        assert {c.kind for c in mixed} == {"subject", "area"}
+        weights = [c.weight for c in mixed]
+        assert weights == sorted(weights, reverse=True)
+
+    def test_used_terms_rank_first(self):
+        assert texts(build_index().complete("b", kinds={"subject"})) == ["Bangla", "Biology"]
+        index = build_index([tutor("Syed Rafi", subjects="Biology")], [{"Subject": "Biology"}])
+        completions = index.complete("b", kinds={"subject"})
+        assert [(c.text, c.weight) for c in completions] == [("Biology", 3), ("Bangla", 1)]
+
+    def test_long_prefix_falls_back_to_binary_search(self):
+        index = build_index([tutor("Muhammad Abdullah Al Mamun")])
+        prefix = "muhammad abdullah"
+        assert len(prefix) > MAX_PREFIX
+        assert texts(index.complete(prefix)) == ["Muhammad Abdullah Al Mamun"]
+
+
+class TestLimits:
+    def test_limit_is_capped_at_the_precomputed_depth(self):
+        index = AutocompleteIndex([(f"Tutor {i:02d}", "tutor", i, [f"tutor {i:02d}"]) for i in range(50)])
+        completions = index.complete("tu", k=50)
+        assert len(completions) == MAX_K
+        assert completions[0].text == "Tutor 49"
+        assert texts(index.complete("tu", k=3, kinds={"tutor"})) == ["Tutor 49", "Tutor 48", "Tutor 47"]
+
+    def test_empty_prefix(self):
+        assert AutocompleteIndex([("Math", "subject", 1, ["math"])]).complete("  ") == []
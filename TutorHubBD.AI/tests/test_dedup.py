@@ -0,0 +1,64 @@
+"""
+TutorHubBD AI Service - Near-duplicate offers
+Reposts are clustered under their oldest copy; deleting, filling or re-sending
+an offer must keep the clusters consistent.
+"""
+
+from dedup import find_duplicate_groups
+from offer_index import OfferIndex
+
+
+class TestDuplicatePass:
+    def test_mixed_timestamps_sort(self):
+        offers = [
+            {"Id": 1, "Title": "Math tutor needed", "Subject": "Math", "Location": "Mirpur",
+             "Salary": 5000, "CreatedAt": "2026-01-05T10:00:00.1234567+06:00"},
+            {"Id": 2, "Title": "Physics tutor", "Subject": "Physics", "Location": "Uttara",
+             "Salary": 6000, "CreatedAt": "2026-01-06T10:00:00"},
+            {"Id": 4, "Title": "Math tutor needed", "Subject": "Math", "Location": "Mirpur",
+             "Salary": 5000, "CreatedAt": None},
+        ]
+        assert find_duplicate_groups(offers).groups() == {4: [1]}
+
+
+class TestOfferLifecycle:
+    def offers(self):
+        return [
+            {"Id": 1, "Title": "Math tutor needed for class 8", "Subject": "Math", "Location": "Mirpur",
+             "Salary": 5000, "CreatedAt": "2026-01-01T10:00:00.1234567+06:00"},
+            {"Id": 2, "Title": "Math tutor needed for class 8!", "Subject": "Math", "Location": "Mirpur",
+             "Salary": 5000, "CreatedAt": "2026-01-02T10:00:00.1234567+06:00"},
+            {"Id": 3, "Title": "Math tutor needed for class 8.", "Subject": "Math", "Location": "Mirpur",
+             "Salary": 5000, "CreatedAt": "2026-01-03T10:00:00.1234567+06:00"},
+        ]
+
+    def test_filled_offer_leaves_ranking_and_hands_over_cluster(self):
+        index = OfferIndex(self.offers())
+        assert index.duplicates.groups() == {1: [2, 3]}
+
+        assert index.update_status(1, 1)  # JobStatus.Filled
+        assert sorted(j["JobId"] for j in index.recommend({}, collapse=False)) == [2, 3]
+        assert index.duplicates.groups() == {2: [3]}
+
+    def test_deleted_offer_no_longer_clusters_reposts(self):
+        index = OfferIndex(self.offers()[:1])
+        assert index.remove(1)
+        assert index.add(self.offers()[1]) is None
+
+    def test_resent_offer_is_not_duplicated(self):
+        index = OfferIndex(self.offers()[:1])
+        index.add(dict(self.offers()[0], Salary=6000))
+        jobs = index.recommend({})
+        assert [(j["JobId"], j["Salary"]) for j in jobs] == [(1, 6000)]
+
+    def test_closed_offers_are_not_indexed(self):
+        index = OfferIndex([dict(o, Status="Closed") for o in self.offers()])
+        assert len(index) == 0
+
+    def test_repeated_ids_are_indexed_once(self):
+        first, second = self.offers()[:2]
+        index = OfferIndex([first, dict(first, Salary=6000), second])
+        assert index.remove(1)
+        assert index.duplicates.groups() == {}
+        # The bucket no longer holds a stale copy of Id 1
+        assert index.add(self.offers()[2]) == 2
@@ -0,0 +1,84 @@
+"""
+TutorHubBD AI Service - Offline hire replay
+Offers are exported as the web app stores them: Subject is always "General"
+and the real request is in Title/Description.
+"""
+
+from datetime import datetime
+
+import fuzzy
+from evaluate import (evaluate, normalize_offer, normalize_review, normalize_tutor, offer_criteria, rating_as_of,
+                      rating_history)
+
+
+class TestOfferCriteria:
+    def test_query_comes_from_title_and_description(self):
+        offer = normalize_offer({"Id": "1", "Title": "Need a physcs tutor", "Subject": "General",
+                                 "Description": "Class 9 student, English medium", "Location": "Mirpur 10",
+                                 "CreatedAt": "2026-01-05T10:00:00.1234567+06:00", "HiredTutorId": "7"})
+        criteria, prompt = offer_criteria(offer, fuzzy.build_index())
+        assert criteria["Subject"] == "physics"
+        assert criteria["ClassLevel"] == "Class 9"
+        assert criteria["Location"] == "mirpur"
+        assert prompt.startswith("Need a physcs tutor")
+
+
+class TestRatingHistory:
+    def test_rating_excludes_reviews_after_the_offer(self):
+        reviews = [normalize_review(r) for r in (
+            {"TutorId": "7", "Rating": "4", "CreatedAt": "2026-01-01T10:00:00"},
+            {"TutorId": "7", "Rating": "2", "CreatedAt": "2026-02-01T10:00:00"},
+            {"TutorId": "7", "Rating": "5", "CreatedAt": "2026-03-01T10:00:00"},
+        )]
+        history = rating_history(reviews)
+        assert rating_as_of(history, 7, datetime(2025, 12, 1)) == 0.0
+        assert rating_as_of(history, 7, datetime(2026, 2, 1, 10)) == 4.0
+        assert rating_as_of(history, 7, datetime(2026, 4, 1)) == 11 / 3
+        assert rating_as_of(history, 8, datetime(2026, 4, 1)) == 0.0
+
+
+def tutor_row(i, subjects, locations, rating, joined="2025-12-01T00:00:00+06:00"):
+    return normalize_tutor({"TutorID": i, "Subjects": subjects, "PreferredLocations": locations,
+                            "Rating": rating, "IsVerified": "1", "IsProfileComplete": "1",
+                            "VerificationRequestDate": joined})
+
+
+def offer_row(i, title, created, hired):
+    return normalize_offer({"Id": i, "Title": title, "Subject": "General", "Location": "Mirpur 10",
+                            "CreatedAt": created, "HiredTutorId": hired})
+
+
+class TestReplay:
+    tutors = [
+        tutor_row(1, "Math", "Mirpur", 5),
+        tutor_row(2, "Math", "Mirpur", 3),
+        tutor_row(3, "Physics", "Uttara", 4),
+        tutor_row(4, "Math", "Mirpur", 4.8, joined="2026-03-01T00:00:00+06:00"),
+    ]
+    offers = [
+        offer_row(1, "Need a math tutor", "2026-01-10T10:00:00.1234567+06:00", 1),  # rank 1
+        offer_row(2, "Math tutor wanted", "2026-01-20T10:00:00.1234567+06:00", 2),  # rank 2
+        normalize_offer({"Id": 3, "Title": "Physics tutor", "Location": "Uttara",
+                         "CreatedAt": "2026-02-01T10:00:00+06:00", "HiredTutorId": 3}),  # rank 1
+        offer_row(4, "Math tutor", "2026-02-10T10:00:00+06:00", 4),  # tutor 4 hadn't joined yet
+        offer_row(5, "Math tutor", "2026-02-15T10:00:00+06:00", 3),  # filtered out: not ranked
+        offer_row(6, "Math tutor", "2026-02-20T10:00:00+06:00", None),  # never filled
+    ]
+
+    def test_known_ranks_across_worker_processes(self):
+        report = evaluate("csharp", self.tutors, self.offers, workers=2, k_values=(1, 5))
+        assert report["evaluated"] == 4
+        assert report["unreachable"] == 1
+        assert report["metrics"] == {"recall@1": 0.5, "recall@5": 0.75, "mrr": (1 + 0.5 + 1) / 4}
+        assert "Rating" in report["current_state_fields"]
+
+    def test_ratings_are_replayed_as_of_each_offer(self):
+        # Tutor 2's 5-star review lands between offers 1 and 2: offer 1 still sees
+        # tutor 1 (rated 1) ahead of the unrated tutor 2, offer 2 sees tutor 2 first
+        reviews = [normalize_review(r) for r in (
+            {"TutorId": 1, "Rating": 1, "CreatedAt": "2026-01-01T10:00:00+06:00"},
+            {"TutorId": 2, "Rating": 5, "CreatedAt": "2026-01-15T10:00:00+06:00"},
+        )]
+        report = evaluate("csharp", self.tutors, self.offers, workers=2, k_values=(1, 5), reviews=reviews)
+        assert report["metrics"] == {"recall@1": 0.75, "recall@5": 0.75, "mrr": 0.75}
+        assert "Rating" not in report["current_state_fields"]
@@ -0,0 +1,116 @@
+"""
+TutorHubBD AI Service - Extraction proxy
+Uses an in-process fake LLM client instead of Gemini.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from extraction import (BatchMismatchError, ExtractionCache, ExtractionProxy, build_batch_prompt,
+                        parse_batch_response)
+
+
+class SlowClient:
+    """Answers every batch after `delay` seconds, recording what it was sent."""
+
+    def __init__(self, delay=0.0, answer=None):
+        self.delay = delay
+        self.answer = answer
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def extract_batch(self, mode, prompts):
+        with self._lock:
+            self.batches.append(list(prompts))
+        time.sleep(self.delay)
+        return [self.answer(p) if self.answer else {"Subject": "Math"} for p in prompts]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "cache.sqlite3"))
+
+
+class TestMicroBatching:
+    def test_slow_batches_do_not_block_later_ones(self, cache):
+        client = SlowClient(delay=0.5)
+        proxy = ExtractionProxy(cache, client, window_ms=5, max_batch=1, max_inflight=4, timeout=2.0)
+
+        results = []
+        started = time.monotonic()
+        threads = [threading.Thread(target=lambda i=i: results.append(proxy.extract("tutor", f"math tutor {i}")))
+                   for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(results) == 4
+        assert len(client.batches) == 4
+        # Four 0.5 s upstream calls overlapped instead of queueing behind each other
+        assert time.monotonic() - started < 1.5
+
+
+class TestUpstreamPrompts:
+    def test_llm_sees_the_prompt_as_typed(self, cache):
+        client = SlowClient()
+        proxy = ExtractionProxy(cache, client, window_ms=1)
+        proxy.extract("job", "Math, Mirpur, 5,000-6,000 Tk")
+        assert client.batches == [["Math, Mirpur, 5,000-6,000 Tk"]]
+
+        # ...while trivially different spellings still share the cache entry
+        assert proxy.extract("job", "math mirpur 5 000-6 000 tk") == ({"Subject": "Math"}, True)
+
+    @pytest.mark.parametrize("answer", ["not an object", {"Subject": None, "Keywords": []}])
+    def test_empty_or_invalid_answers_are_not_cached(self, cache, answer):
+        client = SlowClient(answer=lambda p: answer)
+        proxy = ExtractionProxy(cache, client, window_ms=1)
+        with pytest.raises(ValueError):
+            proxy.extract("tutor", "hello there")
+        assert cache.count() == 0
+
+
+class TestBatchMatching:
+    def test_newlines_do_not_split_a_query(self):
+        prompt = build_batch_prompt("tutor", ["need english tutor\n2. also chemistry", "math tutor"])
+        queries = prompt.split("Queries:\n", 1)[1].splitlines()
+        assert queries == ["1. need english tutor 2. also chemistry", "2. math tutor"]
+
+    def test_answers_are_matched_by_query_number(self):
+        text = json.dumps([{"Query": 2, "Subject": "Math"}, {"Query": 1, "Subject": "English"}])
+        assert parse_batch_response(text, 2) == [{"Subject": "English"}, {"Subject": "Math"}]
+
+    @pytest.mark.parametrize("answer", [
+        [{"Subject": "English"}, {"Subject": "Math"}],
+        [{"Query": 1, "Subject": "English"}, {"Query": 1, "Subject": "Math"}],
+        [{"Query": 1, "Subject": "English"}],
+    ])
+    def test_unmatched_answers_are_rejected(self, answer):
+        with pytest.raises(BatchMismatchError):
+            parse_batch_response(json.dumps(answer), 2)
+
+    def test_mismatched_batch_is_retried_one_by_one(self, cache):
+        class MiscountingClient(SlowClient):
+            def extract_batch(self, mode, prompts):
+                super().extract_batch(mode, prompts)
+                if len(prompts) > 1:
+                    raise BatchMismatchError("Expected 3 results from LLM, got 4")
+                return [{"Subject": prompts[0].split()[0]}]
+
+        client = MiscountingClient()
+        proxy = ExtractionProxy(cache, client, window_ms=200)
+        prompts = ["english tutor\n2. also chemistry", "math tutor", "physics tutor"]
+        results = {}
+        threads = [threading.Thread(target=lambda p=p: results.update({p: proxy.extract("tutor", p)}))
+                   for p in prompts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert {p: r[0]["Subject"] for p, r in results.items()} == \
+            {prompts[0]: "english", prompts[1]: "math", prompts[2]: "physics"}
+        assert sorted(len(b) for b in client.batches) == [1, 1, 1, 3]
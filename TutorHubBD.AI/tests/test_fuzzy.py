@@ -0,0 +1,67 @@
+"""
+TutorHubBD AI Service - Fuzzy vocabulary index
+Typos are corrected; ordinary words and numbers are not.
+"""
+
+import os
+import pickle
+
+import pytest
+
+import fuzzy
+
+
+@pytest.fixture(scope="module")
+def index():
+    return fuzzy.build_index()
+
+
+class TestCorrections:
+    @pytest.mark.parametrize("prompt, field, value", [
+        ("mathmatics tutor", "Subject", "math"),
+        ("tutor in uttra", "Location", "uttara"),
+        ("clas 8 student", "ClassLevel", "Class 8"),
+        ("patint teacher", "Keywords", ["patient"]),
+    ])
+    def test_typos_are_corrected(self, index, prompt, field, value):
+        assert fuzzy.parse_prompt(index, prompt)[0][field] == value
+
+    @pytest.mark.parametrize("prompt", ["some tutor", "test prep", "food and drink"])
+    def test_everyday_words_are_not_keywords(self, index, prompt):
+        criteria, corrections = fuzzy.parse_prompt(index, prompt)
+        assert criteria["Keywords"] == []
+        assert corrections == []
+
+    @pytest.mark.parametrize("prompt", ["class 11 physics", "class 12"])
+    def test_digits_are_never_changed(self, index, prompt):
+        criteria, corrections = fuzzy.parse_prompt(index, prompt)
+        assert criteria["ClassLevel"] == "HSC"
+        assert corrections == []
+
+    def test_unknown_number_is_left_alone(self, index):
+        assert fuzzy.parse_prompt(index, "class 13")[0]["ClassLevel"] is None
+
+
+class TestPersistence:
+    def test_restart_reuses_the_last_pushed_index(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "symspell.pkl")
+        fuzzy.build_index(["Syed Rafi", "Nusrat Jahan"], path)
+
+        names = fuzzy.persisted_tutor_names(path)
+        assert names == ["Nusrat Jahan", "Syed Rafi"]
+        monkeypatch.setattr(fuzzy.SymSpellIndex, "add",
+                            lambda *args: pytest.fail("index was rebuilt instead of loaded"))
+        index = fuzzy.build_index(names, path)
+        assert index.resolve("syed rafy")[0] == "Syed Rafi"
+
+    def test_save_leaves_no_temp_files(self, tmp_path):
+        path = str(tmp_path / "symspell.pkl")
+        fuzzy.build_index(["Syed Rafi"], path)
+        fuzzy.build_index(["Nusrat Jahan"], path)
+        assert os.listdir(tmp_path) == ["symspell.pkl"]
+
+    def test_old_format_is_ignored(self, tmp_path):
+        path = tmp_path / "symspell.pkl"
+        path.write_bytes(pickle.dumps({"format": 1, "fingerprint": "x"}))
+        assert fuzzy.persisted_tutor_names(str(path)) == []
+
@@ -0,0 +1,78 @@
+"""
+TutorHubBD AI Service - Query log, popular queries and pre-warming
+"""
+
+import random
+import time
+
+from querylog import QueryLog, SpaceSaving, normalize_query, prewarm
+from tutor_index import TutorIndex
+
+
+def tutors():
+    return [{"TutorID": i, "FullName": f"Tutor {i}", "IsVerified": True, "IsProfileComplete": True,
+             "Subjects": "Math" if i % 2 else "English", "PreferredLocations": "Mirpur",
+             "Bio": "patient and experienced", "Rating": i % 5} for i in range(50)]
+
+
+class TestSpaceSaving:
+    def test_exact_below_capacity(self):
+        sketch = SpaceSaving(10)
+        for key in "aaabbc":
+            sketch.update(key)
+        assert sketch.top(3) == [("a", 3, 0), ("b", 2, 0), ("c", 1, 0)]
+
+    def test_heavy_hitters_survive_eviction(self):
+        sketch = SpaceSaving(20)
+        rng = random.Random(1)
+        stream = ["hot"] * 300 + ["warm"] * 150 + [f"rare{rng.randrange(5000)}" for _ in range(2000)]
+        rng.shuffle(stream)
+        for key in stream:
+            sketch.update(key)
+        top = sketch.top(2)
+        assert [key for key, _, _ in top] == ["hot", "warm"]
+        for key, count, error in top:
+            # Space-Saving never underestimates, and overestimates by at most `error`
+            assert count - error <= stream.count(key) <= count
+        assert len(sketch) == 20
+
+    def test_updates_do_not_scale_with_capacity(self):
+        sketch = SpaceSaving(10000)
+        keys = [f"q{i}" for i in range(50000)]
+        started = time.perf_counter()
+        for key in keys:
+            sketch.update(key)
+        assert (time.perf_counter() - started) / len(keys) < 50e-6
+
+
+class TestPopularCriteria:
+    def test_prompt_is_not_part_of_matched_queries(self):
+        index = TutorIndex(tutors())
+        results, used_prompt = index.search({"Subject": "math"}, "need a math tutor near mirpur")
+        assert results and not used_prompt
+        # A differently worded prompt with the same criteria is a cache hit
+        assert index.search({"Subject": "math"}, "math teacher please")[0] is results
+        assert normalize_query({"Subject": "Math"}) == {"criteria": {"Subject": "math"}, "schedule": "", "limit": 20}
+
+    def test_prompt_counts_when_broad_search_ran(self):
+        index = TutorIndex(tutors())
+        results, used_prompt = index.search({"Subject": "physics"}, "patient teacher")
+        assert used_prompt and results
+        assert index.search({"Subject": "physics"}, "nothing relevant")[0] == []
+
+    def test_log_replays_after_restart(self, tmp_path):
+        path = str(tmp_path / "queries.log")
+        log = QueryLog(path)
+        for _ in range(3):
+            log.record(normalize_query({"Subject": "Math"}, limit=10), 1.0)
+        log.record(normalize_query({"Subject": "English"}, limit=10), 1.0)
+        log.close()
+
+        restarted = QueryLog(path)
+        top = restarted.top(5)
+        restarted.close()
+        assert [(q["criteria"], n) for q, n, _ in top] == [({"Subject": "math"}, 3), ({"Subject": "english"}, 1)]
+
+        index = TutorIndex(tutors())
+        assert prewarm(index, [q for q, _, _ in top]) == 2
+        assert len(index._cache) == 2
@@ -0,0 +1,56 @@
+"""
+TutorHubBD AI Service - Offer timestamps and job ranking
+Offers arrive as serialized by System.Text.Json, so CreatedAt carries
+7 fractional digits and a UTC offset.
+"""
+
+from datetime import datetime, timedelta
+
+from offer_index import OfferIndex
+from ranking import parse_datetime
+
+
+def csharp_now(delta=timedelta(), fraction=True):
+    """DateTime.Now the way System.Text.Json writes it."""
+    now = (datetime.now() - delta).astimezone()
+    text = now.strftime("%Y-%m-%dT%H:%M:%S")
+    if fraction:
+        text += ".1234567"
+    return text + now.strftime("%z")[:3] + ":" + now.strftime("%z")[3:]
+
+
+class TestParseDatetime:
+    def test_offset_with_seven_digit_fraction(self):
+        parsed = parse_datetime("2026-01-05T10:00:00.1234567+06:00")
+        assert parsed == parse_datetime("2026-01-05T04:00:00Z").replace(microsecond=123456)
+        assert parsed.tzinfo is None
+
+    def test_results_are_naive(self):
+        for value in ("2026-01-05T10:00:00+00:00", "2026-01-05T10:00:00.12345+00:00",
+                      "2026-01-05T10:00:00Z", "2026-01-05 10:00:00.1234567", "2026-01-05"):
+            assert parse_datetime(value).tzinfo is None
+
+    def test_offsets_are_converted(self):
+        assert parse_datetime("2026-01-05T10:00:00+06:00") == parse_datetime("2026-01-05T04:00:00Z")
+        assert parse_datetime("2026-01-05T10:00:00-05:30") == parse_datetime("2026-01-05T15:30:00Z")
+
+    def test_empty_values(self):
+        assert parse_datetime(None) is None
+        assert parse_datetime("NULL") is None
+
+
+class TestOfferRanking:
+    def offers(self):
+        return [
+            {"Id": 1, "Title": "Math tutor needed", "Subject": "Math", "City": "Dhaka", "Location": "Mirpur",
+             "Salary": 5000, "CreatedAt": csharp_now(timedelta(days=20))},
+            {"Id": 2, "Title": "Physics tutor", "Subject": "Physics", "City": "Dhaka", "Location": "Uttara",
+             "Salary": 6000, "CreatedAt": csharp_now(fraction=False)},
+        ]
+
+    def test_recommend_with_csharp_timestamps(self):
+        index = OfferIndex(self.offers())
+        index.add({"Id": 3, "Title": "English tutor", "Subject": "English", "City": "Dhaka",
+                   "Location": "Mirpur", "Salary": 4000, "CreatedAt": csharp_now()})
+        jobs = index.recommend({"City": "Dhaka"})
+        assert [j["JobId"] for j in jobs] == [2, 3, 1]
@@ -0,0 +1,108 @@
+"""
+TutorHubBD AI Service - Salary sketches and cells
+Offers come from TuitionOfferController.Create, which stores Subject as
+"General" and Location as free text.
+"""
+
+import bisect
+import os
+import random
+
+import pytest
+
+import fuzzy
+from salary import KLLSketch, SalaryIndex, offer_cell, query_cell
+
+
+@pytest.fixture(scope="module")
+def index():
+    return fuzzy.build_index()
+
+
+def web_offer(i, salary, title="Need a Math tutor for my son", location="Mirpur 10"):
+    return {"Id": i, "Title": title, "Description": "Class 8 student, 3 days a week",
+            "Subject": "General", "Location": location, "City": "Dhaka",
+            "Medium": "Bangla", "StudentClass": "Class 8", "Salary": salary}
+
+
+class TestSalaryCells:
+    def test_offer_cell_comes_from_title_and_location(self, index):
+        assert offer_cell(web_offer(1, 5000), index) == ("math", "class 8", "mirpur", "bangla")
+
+    def test_unrecognized_fields_become_any(self, index):
+        offer = web_offer(1, 5000, title="Home tutor needed", location="Block C, Road 4")
+        assert offer_cell(offer, index) == ("*", "class 8", "*", "bangla")
+
+    def test_query_matches_offer_cells(self, index):
+        assert query_cell(index, "Mathematics", "class 8", "Mirpur", "Bangla") == \
+            offer_cell(web_offer(1, 5000), index)
+
+    def test_estimate_uses_exact_cell(self, index):
+        offers = [web_offer(i, 4000 + 100 * i) for i in range(12)]
+        salaries = SalaryIndex.build((offer_cell(o, index), o["Salary"]) for o in offers)
+        estimate = salaries.estimate(query_cell(index, "Math", "Class 8", "Mirpur", "Bangla"))
+        assert estimate["exact"]
+        assert estimate["cell"] == {"subject": "math", "class": "class 8", "area": "mirpur", "medium": "bangla"}
+        assert estimate["samples"] == 12
+
+
+class TestKLLSketch:
+    def rank_error(self, sketch, values):
+        ordered = sorted(values)
+        worst = 0.0
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            estimate = sketch.quantiles([q])[0]
+            true_rank = bisect.bisect_left(ordered, estimate) / len(ordered)
+            worst = max(worst, abs(true_rank - q))
+        return worst
+
+    def test_quantiles_are_accurate(self):
+        rng = random.Random(7)
+        values = [rng.randint(1000, 50000) for _ in range(50000)]
+        sketch = KLLSketch(seed=1)
+        for v in values:
+            sketch.update(v)
+        assert sketch.count == len(values)
+        assert sum(len(level) for level in sketch.compactors) < 1000
+        assert self.rank_error(sketch, values) < 0.02
+
+    def test_merge_matches_one_sketch_over_all_values(self):
+        rng = random.Random(11)
+        low = [rng.gauss(5000, 800) for _ in range(20000)]
+        high = [rng.gauss(12000, 2000) for _ in range(10000)]
+        a, b = KLLSketch(seed=2), KLLSketch(seed=3)
+        for v in low:
+            a.update(v)
+        for v in high:
+            b.update(v)
+        merged = a.merge(b)
+        assert merged.count == 30000
+        assert self.rank_error(merged, low + high) < 0.02
+
+    def test_empty_sketch(self):
+        assert KLLSketch().quantiles([0.5]) == [None]
+
+
+class TestSalaryIndex:
+    def test_offer_counts_once(self, index):
+        salaries = SalaryIndex()
+        cell = offer_cell(web_offer(1, 5000), index)
+        assert salaries.add(cell, 5000, offer_id=1)
+        assert not salaries.add(cell, 5000, offer_id=1)
+        assert salaries.estimate(cell, min_samples=1)["samples"] == 1
+
+    def test_saved_sketches_survive_a_restart(self, index, tmp_path):
+        offers = [web_offer(i, 4000 + 100 * i) for i in range(12)]
+        salaries = SalaryIndex.build(((offer_cell(o, index), o["Salary"]) for o in offers),
+                                     offer_ids=[o["Id"] for o in offers])
+        path = str(tmp_path / "salary.pkl")
+        salaries.save(path)
+
+        loaded = SalaryIndex.load(path)
+        cell = offer_cell(offers[0], index)
+        assert loaded.estimate(cell) == salaries.estimate(cell)
+        assert not loaded.add(cell, 9000, offer_id=3)
+        assert os.listdir(tmp_path) == ["salary.pkl"]
+
+    def test_missing_file_loads_nothing(self, tmp_path):
+        assert SalaryIndex.load(str(tmp_path / "salary.pkl")) is None
@@ -0,0 +1,90 @@
+"""
+TutorHubBD AI Service - Schedule parsing
+Inputs are typical TuitionOffer.DaysPerWeek values.
+"""
+
+import pytest
+
+from schedule import ALL_SLOTS, PERIODS, SLOTS_PER_DAY, parse_schedule
+from tutor_index import TutorIndex
+
+
+def slots(schedule, day=0):
+    """Slot indexes set on one day (Saturday by default)."""
+    byte = (schedule.bits >> (8 * day)) & ((1 << SLOTS_PER_DAY) - 1)
+    return {s for s in range(SLOTS_PER_DAY) if byte >> s & 1}
+
+
+class TestParseSchedule:
+    @pytest.mark.parametrize("text, min_days", [
+        ("3-4 days a week", 3),
+        ("3 to 4 days", 3),
+        ("5 days", 5),
+        ("3", 3),
+    ])
+    def test_day_counts_are_not_time_ranges(self, text, min_days):
+        schedule = parse_schedule(text)
+        assert schedule.min_days == min_days
+        assert schedule.bits == ALL_SLOTS
+
+    def test_durations_are_not_time_ranges(self):
+        assert parse_schedule("2-3 hours").bits == ALL_SLOTS
+        assert parse_schedule("3 days, 1-2 hrs each").bits == ALL_SLOTS
+
+    def test_afternoon_is_not_noon(self):
+        assert slots(parse_schedule("afternoon")) == set(PERIODS["afternoon"])
+        assert slots(parse_schedule("noon")) == set(PERIODS["noon"])
+
+    def test_time_ranges_and_days(self):
+        schedule = parse_schedule("Sat-Mon 4-6pm")
+        assert schedule.min_days == 3
+        assert slots(schedule, 0) == slots(schedule, 2) == {4, 5}
+        assert slots(schedule, 3) == set()
+
+    def test_named_days_with_count_and_period(self):
+        schedule = parse_schedule("3-4 days, Sun Tue Thu evening")
+        assert schedule.min_days == 3
+        assert slots(schedule, 1) == set(PERIODS["evening"])
+        assert slots(schedule, 0) == set()
+
+    @pytest.mark.parametrize("text, expected", [
+        ("5-7", {5}),
+        ("6-8", {5, 6}),
+        ("5:30-7:30", {5, 6}),
+        ("4-6pm", {4, 5}),
+        ("10-1pm", {1, 2}),
+        ("11am-1", {2}),
+        ("7-9", {0}),
+    ])
+    def test_bare_end_hour_follows_the_start(self, text, expected):
+        assert slots(parse_schedule(text)) == expected
+
+    @pytest.mark.parametrize("text, days, min_days", [
+        ("5 days except friday", {0, 1, 2, 3, 4, 5}, 5),
+        ("friday off", {0, 1, 2, 3, 4, 5}, 6),
+        ("sun-thu except tue", {1, 2, 4, 5}, 4),
+        ("fri and sat off, 4-6", {1, 2, 3, 4, 5}, 5),
+    ])
+    def test_excluded_days(self, text, days, min_days):
+        schedule = parse_schedule(text)
+        assert {d for d in range(7) if slots(schedule, d)} == days
+        assert schedule.min_days == min_days
+
+
+class TestScheduleRanking:
+    def tutor(self, i, availability, rating=4):
+        return {"TutorID": i, "IsVerified": True, "IsProfileComplete": True, "Subjects": "Math",
+                "PreferredLocations": "Mirpur", "Rating": rating, "Availability": availability}
+
+    def test_better_schedule_fit_ranks_first(self):
+        index = TutorIndex([self.tutor(1, "Sun Tue Thu 5-7", rating=5),
+                            self.tutor(2, "Sun Tue Thu 3-7", rating=4),
+                            self.tutor(3, "Fri 3-7")])
+        results = index.recommend({"Subject": "Math"}, schedule=parse_schedule("Sun Tue Thu 3-7pm"))
+        assert [(r["TutorID"], r["ScheduleScore"]) for r in results] == [(2, 1.0), (1, 0.5)]
+
+    def test_schedule_fit_does_not_outweigh_the_criteria(self):
+        tutors = [self.tutor(1, "Sun 5-7"), dict(self.tutor(2, "Sun 3-7"), PreferredLocations="Uttara")]
+        index = TutorIndex(tutors, variant="soft")
+        results = index.recommend({"Subject": "Math", "Location": "Mirpur"}, schedule=parse_schedule("Sun 3-7pm"))
+        assert [r["TutorID"] for r in results] == [1, 2]
@@ -0,0 +1,57 @@
+"""
+TutorHubBD AI Service - Request body decoding
+Malformed bodies must come back as 400 in the caller's format, not as a 500 page.
+"""
+
+import gzip
+
+import pytest
+from flask import Flask
+
+import wire
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.errorhandler(wire.WireError)
+    def handle_wire_error(ex):
+        return wire.error(str(ex), ex.status)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return wire.respond(wire.read_body())
+
+    return app.test_client()
+
+
+class TestReadBody:
+    def test_json_and_gzip_bodies(self, client):
+        assert client.post('/echo', json={"a": 1}).json == {"a": 1}
+        response = client.post('/echo', data=gzip.compress(b'{"a": 1}'),
+                               headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+        assert response.json == {"a": 1}
+
+    @pytest.mark.parametrize("data, headers", [
+        (b"{bad", {}),
+        (b"\xff\xfe", {}),
+        (b"not gzip at all", {"Content-Encoding": "gzip"}),
+        (gzip.compress(b'{"a": 1}')[:-6], {"Content-Encoding": "gzip"}),
+    ])
+    def test_malformed_bodies_are_400(self, client, data, headers):
+        response = client.post('/echo', data=data, headers={"Content-Type": "application/json", **headers})
+        assert response.status_code == 400
+        assert "error" in response.json
+
+    def test_malformed_msgpack_is_400(self, client):
+        pytest.importorskip("msgpack")
+        response = client.post('/echo', data=b"\xc1", headers={"Content-Type": "application/msgpack"})
+        assert response.status_code == 400
+
+    def test_gzip_bomb_is_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(wire, "MAX_BODY_BYTES", 1024)
+        bomb = gzip.compress(b'{"a": "' + b"x" * 10000 + b'"}')
+        response = client.post('/echo', data=bomb,
+                               headers={"Content-Type": "application/json", "Content-Encoding": "gzip"})
+        assert response.status_code == 413
@@ -0,0 +1,115 @@
+# In-memory tutor index behind /recommend
+#
+# The web app pushes tutor records (columns of the Tutors table plus the
+# user's FullName and an optional free-text Availability) to /index/tutors.
+# The index keeps the ranker for the text criteria and a ScheduleMatrix so
+# that schedule compatibility is one vectorized pass over all tutors. Tutors
+# who can't make enough of the requested days are dropped; for the rest, the
+# share of requested slots they cover is added to the match score.
+# Results are cached per index, so a swapped-in index starts cold until
+# the popular queries are replayed against it (see querylog.prewarm).
+
+import json
+import threading
+from collections import OrderedDict
+
+from ranking import RANKERS
+from schedule import ANY_TIME, ScheduleMatrix, parse_schedule
+
+CACHE_SIZE = 2048
+
+# Points for covering every requested slot: as much as a location match
+# (tutor_match_score), so schedule fit reorders close candidates but never
+# outweighs the subject
+SCHEDULE_WEIGHT = 20
+
+# Cached under a criteria-only key when the criteria match no one, so the
+# answer depends on the prompt (the ranker's broad fallback)
+_NEEDS_PROMPT = object()
+
+
+class TutorIndex:
+    def __init__(self, tutors, variant="csharp"):
+        self.variant = variant
+        self.tutors = {t["TutorID"]: t for t in tutors}
+        self.ranker = RANKERS[variant](tutors)
+        ids = list(self.tutors)
+        self.position = {tutor_id: i for i, tutor_id in enumerate(ids)}
+        self.schedules = ScheduleMatrix(ids, [
+            parse_schedule(self.tutors[i]["Availability"]) if self.tutors[i].get("Availability") else ANY_TIME
+            for i in ids
+        ])
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tutors)
+
+    def recommend(self, criteria, prompt=None, schedule=None, limit=20):
+        """Ranked tutors for the criteria; when a schedule is given, tutors who
+        can't make enough of its days are dropped and the rest are re-ranked by
+        match score + SCHEDULE_WEIGHT x ScheduleScore."""
+        return self.search(criteria, prompt, schedule, limit)[0]
+
+    def search(self, criteria, prompt=None, schedule=None, limit=20):
+        """(results, whether they came from the broad search over the prompt).
+
+        The prompt only matters when the criteria match no one, so results are
+        cached by criteria, schedule and limit, plus the prompt only then."""
+        key = (json.dumps(criteria, sort_keys=True, default=str),
+               (schedule.bits, schedule.min_days) if schedule is not None else None, limit)
+        results = self._cached(key)
+        if results is None:
+            ranked = self.ranker.rank_scored(criteria)
+            if ranked:
+                return self._store(key, self._results(ranked, schedule, limit)), False
+            self._store(key, _NEEDS_PROMPT)
+        elif results is not _NEEDS_PROMPT:
+            return results, False
+
+        key += (prompt or "",)
+        results = self._cached(key)
+        if results is None:
+            ranked = self.ranker.rank_scored(criteria, prompt) if prompt else []
+            results = self._store(key, self._results(ranked, schedule, limit))
+        return results, bool(prompt)
+
+    def _cached(self, key):
+        with self._lock:
+            results = self._cache.get(key)
+            if results is not None:
+                self._cache.move_to_end(key)
+            return results
+
+    def _store(self, key, results):
+        with self._lock:
+            self._cache[key] = results
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return results
+
+    def _results(self, ranked, schedule, limit):
+        """ranked: [(tutor ID, match score)] best first."""
+        scores = None
+        if schedule is not None:
+            compatible, scores = self.schedules.match(schedule)
+            ranked = [(i, score + SCHEDULE_WEIGHT * float(scores[self.position[i]]))
+                      for i, score in ranked if compatible[self.position[i]]]
+            # Stable: equal totals keep the ranker's order (rating)
+            ranked.sort(key=lambda r: -r[1])
+
+        results = []
+        for rank, (tutor_id, _) in enumerate(ranked[:limit], start=1):
+            tutor = self.tutors[tutor_id]
+            result = {
+                "TutorID": tutor_id,
+                "FullName": tutor.get("FullName"),
+                "Subjects": tutor.get("Subjects"),
+                "PreferredLocations": tutor.get("PreferredLocations"),
+                "Rating": tutor.get("Rating"),
+                "Rank": rank,
+            }
+            if scores is not None:
+                result["ScheduleScore"] = round(float(scores[self.position[tutor_id]]), 3)
+            results.append(result)
+        return results
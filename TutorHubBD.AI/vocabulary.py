@@ -0,0 +1,43 @@
+# Canonical vocabularies shared by the AI service.
+# These mirror the lists used by AiSearchService's fallback extractors in the
+# web app, so the Python side and the C# side agree on what a "subject",
+# "class level" or "area" is.
+
+SUBJECTS = [
+    "math", "mathematics", "english", "physics", "chemistry", "biology",
+    "bangla", "bengali", "ict", "computer", "accounting", "economics",
+    "science", "social science", "history", "geography",
+]
+
+# Spelling variants resolve to the short form so Contains-style profile filters
+# still match ("math" is in both "Math" and "Mathematics")
+SUBJECT_ALIASES = {"mathematics": "math", "bengali": "bangla"}
+
+# Lower-case alias -> canonical class level (same spellings as Tutor.AvailableClasses)
+CLASS_LEVELS = {
+    "nursery": "Nursery", "kg": "KG", "kindergarten": "KG",
+    "class 1": "Class 1", "class 2": "Class 2", "class 3": "Class 3",
+    "class 4": "Class 4", "class 5": "Class 5", "class 6": "Class 6",
+    "class 7": "Class 7", "class 8": "Class 8", "class 9": "Class 9",
+    "class 10": "Class 10", "class 11": "HSC", "class 12": "HSC", "hsc": "HSC", "a-level": "A-Level",
+    "a level": "A-Level", "o-level": "O-Level", "o level": "O-Level",
+}
+
+CITIES = [
+    "dhaka", "chittagong", "sylhet", "khulna", "rajshahi", "rangpur",
+    "barisal", "comilla",
+]
+
+AREAS = [
+    "mirpur", "uttara", "dhanmondi", "gulshan", "banani", "mohammadpur",
+    "motijheel", "bashundhara", "badda", "rampura", "farmgate", "online",
+]
+
+MEDIUMS = {"english medium": "English", "bangla medium": "Bangla", "bengali medium": "Bangla"}
+
+TUTOR_KEYWORDS = [
+    "patient", "experienced", "friendly", "strict", "professional",
+    "caring", "dedicated", "qualified", "expert", "good", "best",
+]
+
+JOB_KEYWORDS = ["flexible", "nearby", "part-time", "full-time", "weekend", "online", "home"]
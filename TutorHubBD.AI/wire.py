@@ -0,0 +1,175 @@
+# Wire format negotiation for the AI service
+#
+# JSON stays the default so existing callers keep working. High-volume callers
+# can ask for something cheaper through the usual headers:
+#   Accept: application/msgpack                 -> MessagePack body
+#   Accept: application/vnd.apache.arrow.stream -> Arrow IPC (tabular endpoints only)
+#   Accept-Encoding: zstd / gzip                -> compressed body
+# Request bodies may likewise be sent as MessagePack and/or gzip-compressed.
+# Every response carries X-Schema-Version; a caller asking for a newer schema
+# than we speak gets a 406 instead of silently misreading fields.
+
+import gzip
+import json
+import zlib
+
+from flask import Response, request
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON only
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip only
+    zstandard = None
+
+try:
+    import pyarrow
+except ImportError:  # optional: no Arrow IPC
+    pyarrow = None
+
+SCHEMA_VERSION = 1
+SCHEMA_HEADER = "X-Schema-Version"
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Small bodies are cheaper to send than to compress
+MIN_COMPRESS_BYTES = 1024
+
+# Largest request body we'll inflate a compressed upload to
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class WireError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def check_schema_version():
+    """Raises WireError(406) if the caller asks for a schema we don't speak."""
+    requested = request.headers.get(SCHEMA_HEADER)
+    if requested is None:
+        return
+    try:
+        version = int(requested)
+    except ValueError:
+        raise WireError(f"Invalid {SCHEMA_HEADER}: {requested}")
+    if version > SCHEMA_VERSION or version < 1:
+        raise WireError(f"Schema version {version} not supported (server speaks {SCHEMA_VERSION})", 406)
+
+
+def _gunzip(raw):
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = inflater.decompress(raw, MAX_BODY_BYTES)
+    if inflater.unconsumed_tail:
+        raise WireError("Request body too large", 413)
+    if not inflater.eof:
+        raise WireError("Truncated gzip request body")
+    return data
+
+
+def read_body():
+    """Decoded request body (JSON or MessagePack, optionally gzip/zstd-encoded), or {}.
+
+    Undecodable bodies raise WireError(400), as request.json did."""
+    raw = request.get_data()
+    if not raw:
+        return {}
+    encoding = (request.headers.get("Content-Encoding") or "").lower()
+    try:
+        if encoding == "gzip":
+            raw = _gunzip(raw)
+        elif encoding == "zstd":
+            if zstandard is None:
+                raise WireError("zstd request bodies are not supported on this server", 415)
+            raw = zstandard.ZstdDecompressor().decompress(raw, max_output_size=MAX_BODY_BYTES)
+        elif encoding not in ("", "identity"):
+            raise WireError(f"Unsupported Content-Encoding: {encoding}", 415)
+    except zlib.error as ex:
+        raise WireError(f"Invalid gzip request body: {ex}")
+    except Exception as ex:
+        if zstandard is not None and isinstance(ex, zstandard.ZstdError):
+            raise WireError(f"Invalid zstd request body: {ex}")
+        raise
+
+    mimetype = request.mimetype
+    if mimetype in (MSGPACK, "application/x-msgpack"):
+        if msgpack is None:
+            raise WireError("MessagePack request bodies are not supported on this server", 415)
+        try:
+            data = msgpack.unpackb(raw, raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as ex:
+            raise WireError(f"Invalid MessagePack request body: {ex}")
+    else:
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except ValueError as ex:  # includes JSONDecodeError and UnicodeDecodeError
+            raise WireError(f"Invalid JSON request body: {ex}")
+    return data if isinstance(data, dict) else {}
+
+
+def _choose_format(table):
+    offers = [JSON]
+    if msgpack is not None:
+        offers.append(MSGPACK)
+    if pyarrow is not None and table is not None:
+        offers.append(ARROW)
+    if not request.accept_mimetypes:
+        return JSON
+    return request.accept_mimetypes.best_match(offers, default=JSON)
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if zstandard is not None and accepted["zstd"]:
+        return "zstd"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _arrow_bytes(payload, table):
+    """The list under `table` becomes the record batch; remaining scalars go in schema metadata."""
+    rows = payload.get(table) or []
+    arrow_table = pyarrow.Table.from_pylist(rows)
+    meta = {k: json.dumps(v) for k, v in payload.items() if k != table}
+    meta["table"] = json.dumps(table)
+    meta["schema_version"] = str(SCHEMA_VERSION)
+    arrow_table = arrow_table.replace_schema_metadata(meta)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+
+def respond(payload, status=200, table=None):
+    """Serializes payload according to the request's Accept/Accept-Encoding headers.
+
+    `table` names the list in payload that can be shipped column-wise as Arrow IPC."""
+    mimetype = _choose_format(table)
+    if mimetype == MSGPACK:
+        body = msgpack.packb(payload, use_bin_type=True)
+    elif mimetype == ARROW:
+        body = _arrow_bytes(payload, table)
+    else:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    headers = {SCHEMA_HEADER: str(SCHEMA_VERSION), "Vary": "Accept, Accept-Encoding"}
+    encoding = _choose_encoding() if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding == "zstd":
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+        headers["Content-Encoding"] = "zstd"
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(body, status=status, mimetype=mimetype, headers=headers)
+
+
+def error(message, status):
+    return respond({"error": message}, status)
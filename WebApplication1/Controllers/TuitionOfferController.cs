@@ -249,6 +249,7 @@ namespace TutorHubBD.Web.Controllers
                 }
 
                 await _context.SaveChangesAsync();
+                await _service.NotifyOfferStatusChangedAsync(job);
                 await _commissionService.CreateInvoiceAsync(job.Id, job.Salary);
 
                 var commissionAmount = job.Salary * 0.40m;
@@ -1,3 +1,4 @@
+using System.Net;
 using Microsoft.AspNetCore.Identity;
 using Microsoft.EntityFrameworkCore;
 using System.Text.Json.Serialization;
@@ -56,6 +57,19 @@ builder.Services.Configure<StripeSettings>(builder.Configuration.GetSection("Str
 
 builder.Services.AddHttpClient();
 
+// Python AI service: pooled keep-alive connections and compressed responses
+builder.Services.AddHttpClient("AiService", client =>
+    {
+        client.Timeout = TimeSpan.FromSeconds(30);
+        client.DefaultRequestHeaders.Add("X-Schema-Version", "1");
+    })
+    .ConfigurePrimaryHttpMessageHandler(() => new SocketsHttpHandler
+    {
+        AutomaticDecompression = DecompressionMethods.GZip | DecompressionMethods.Deflate,
+        PooledConnectionLifetime = TimeSpan.FromMinutes(5),
+        PooledConnectionIdleTimeout = TimeSpan.FromMinutes(2)
+    });
+
 builder.Services.AddScoped<ITuitionOfferService, TuitionOfferService>();
 builder.Services.AddScoped<TuitionRequestService>();
 builder.Services.AddScoped<ICommissionService, CommissionService>();
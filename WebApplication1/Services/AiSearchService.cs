@@ -14,6 +14,7 @@ namespace TutorHubBD.Web.Services
         private readonly IConfiguration _configuration;
         private readonly ILogger<AiSearchService> _logger;
         private readonly HttpClient _httpClient;
+        private readonly HttpClient _aiServiceClient;
 
         public AiSearchService(
             ApplicationDbContext context,
@@ -25,6 +26,7 @@ namespace TutorHubBD.Web.Services
             _configuration = configuration;
             _logger = logger;
             _httpClient = httpClientFactory.CreateClient();
+            _aiServiceClient = httpClientFactory.CreateClient("AiService");
         }
 
         #region Tutor Search (For Guardians)
@@ -33,6 +35,19 @@ namespace TutorHubBD.Web.Services
         {
             var criteria = new TutorSearchCriteria { OriginalPrompt = userPrompt };
 
+            // Prefer the AI service proxy (shared cache + batched LLM calls) when configured
+            var proxied = await ExtractViaAiServiceAsync("tutor", userPrompt);
+            if (proxied.HasValue)
+            {
+                PopulateTutorCriteria(criteria, proxied.Value);
+                return criteria;
+            }
+            if (IsAiServiceConfigured)
+            {
+                // The proxy already asked the LLM (or gave up waiting on it); a second paid call won't do better
+                return ExtractCriteriaFallback(userPrompt);
+            }
+
             try
             {
                 var apiKey = _configuration["GeminiApi:ApiKey"];
@@ -114,20 +129,7 @@ Rules:
                 // Parse the extracted JSON
                 var extractedData = JsonSerializer.Deserialize<JsonElement>(generatedText);
 
-                criteria.Subject = GetJsonStringOrNull(extractedData, "Subject");
-                criteria.ClassLevel = GetJsonStringOrNull(extractedData, "ClassLevel");
-                criteria.Location = GetJsonStringOrNull(extractedData, "Location");
-                criteria.GenderPreference = GetJsonStringOrNull(extractedData, "GenderPreference");
-
-                if (extractedData.TryGetProperty("Keywords", out var keywordsElement) && 
-                    keywordsElement.ValueKind == JsonValueKind.Array)
-                {
-                    criteria.Keywords = keywordsElement.EnumerateArray()
-                        .Where(k => k.ValueKind == JsonValueKind.String)
-                        .Select(k => k.GetString()!)
-                        .Where(k => !string.IsNullOrEmpty(k))
-                        .ToList();
-                }
+                PopulateTutorCriteria(criteria, extractedData);
 
                 _logger.LogInformation($"AI extracted criteria: Subject={criteria.Subject}, Class={criteria.ClassLevel}, Location={criteria.Location}");
                 return criteria;
@@ -330,6 +332,17 @@ Rules:
         {
             var criteria = new JobSearchCriteria { OriginalPrompt = userPrompt };
 
+            var proxied = await ExtractViaAiServiceAsync("job", userPrompt);
+            if (proxied.HasValue)
+            {
+                PopulateJobCriteria(criteria, proxied.Value);
+                return criteria;
+            }
+            if (IsAiServiceConfigured)
+            {
+                return ExtractJobCriteriaFallback(userPrompt);
+            }
+
             try
             {
                 var apiKey = _configuration["GeminiApi:ApiKey"];
@@ -395,23 +408,7 @@ Rules:
                 generatedText = generatedText.Replace("```json", "").Replace("```", "").Trim();
                 var extractedData = JsonSerializer.Deserialize<JsonElement>(generatedText);
 
-                criteria.Subject = GetJsonStringOrNull(extractedData, "Subject");
-                criteria.ClassLevel = GetJsonStringOrNull(extractedData, "ClassLevel");
-                criteria.City = GetJsonStringOrNull(extractedData, "City");
-                criteria.Location = GetJsonStringOrNull(extractedData, "Location");
-                criteria.Medium = GetJsonStringOrNull(extractedData, "Medium");
-                criteria.MinSalary = GetJsonIntOrNull(extractedData, "MinSalary");
-                criteria.MaxSalary = GetJsonIntOrNull(extractedData, "MaxSalary");
-
-                if (extractedData.TryGetProperty("Keywords", out var keywordsElement) && 
-                    keywordsElement.ValueKind == JsonValueKind.Array)
-                {
-                    criteria.Keywords = keywordsElement.EnumerateArray()
-                        .Where(k => k.ValueKind == JsonValueKind.String)
-                        .Select(k => k.GetString()!)
-                        .Where(k => !string.IsNullOrEmpty(k))
-                        .ToList();
-                }
+                PopulateJobCriteria(criteria, extractedData);
 
                 _logger.LogInformation($"AI extracted job criteria: Subject={criteria.Subject}, Class={criteria.ClassLevel}, City={criteria.City}");
                 return criteria;
@@ -640,6 +637,77 @@ Rules:
 
         #region Helper Methods
 
+        // Calls the Python AI service's /extract endpoint. Returns null when the
+        // service is not configured or fails, so callers fall through to Gemini/fallback.
+        private bool IsAiServiceConfigured => !string.IsNullOrEmpty(_configuration["AiService:BaseUrl"]);
+
+        // Returns null when the service isn't configured or didn't answer; callers then
+        // use the keyword fallback rather than calling Gemini themselves
+        private async Task<JsonElement?> ExtractViaAiServiceAsync(string mode, string userPrompt)
+        {
+            var baseUrl = _configuration["AiService:BaseUrl"];
+            if (string.IsNullOrEmpty(baseUrl))
+                return null;
+
+            try
+            {
+                var jsonContent = JsonSerializer.Serialize(new { prompt = userPrompt, mode });
+                var content = new StringContent(jsonContent, Encoding.UTF8, "application/json");
+
+                var response = await _aiServiceClient.PostAsync($"{baseUrl.TrimEnd('/')}/extract", content);
+                var responseContent = await response.Content.ReadAsStringAsync();
+
+                if (!response.IsSuccessStatusCode)
+                {
+                    _logger.LogWarning($"AI service extraction error: {response.StatusCode} - {responseContent}");
+                    return null;
+                }
+
+                var result = JsonSerializer.Deserialize<JsonElement>(responseContent);
+                if (result.TryGetProperty("criteria", out var extracted) && extracted.ValueKind == JsonValueKind.Object)
+                    return extracted;
+            }
+            catch (Exception ex)
+            {
+                _logger.LogWarning(ex, "Error calling AI service for extraction.");
+            }
+            return null;
+        }
+
+        private void PopulateTutorCriteria(TutorSearchCriteria criteria, JsonElement extractedData)
+        {
+            criteria.Subject = GetJsonStringOrNull(extractedData, "Subject");
+            criteria.ClassLevel = GetJsonStringOrNull(extractedData, "ClassLevel");
+            criteria.Location = GetJsonStringOrNull(extractedData, "Location");
+            criteria.GenderPreference = GetJsonStringOrNull(extractedData, "GenderPreference");
+            criteria.Keywords = GetJsonStringList(extractedData, "Keywords");
+        }
+
+        private void PopulateJobCriteria(JobSearchCriteria criteria, JsonElement extractedData)
+        {
+            criteria.Subject = GetJsonStringOrNull(extractedData, "Subject");
+            criteria.ClassLevel = GetJsonStringOrNull(extractedData, "ClassLevel");
+            criteria.City = GetJsonStringOrNull(extractedData, "City");
+            criteria.Location = GetJsonStringOrNull(extractedData, "Location");
+            criteria.Medium = GetJsonStringOrNull(extractedData, "Medium");
+            criteria.MinSalary = GetJsonIntOrNull(extractedData, "MinSalary");
+            criteria.MaxSalary = GetJsonIntOrNull(extractedData, "MaxSalary");
+            criteria.Keywords = GetJsonStringList(extractedData, "Keywords");
+        }
+
+        private List<string> GetJsonStringList(JsonElement element, string propertyName)
+        {
+            if (element.TryGetProperty(propertyName, out var prop) && prop.ValueKind == JsonValueKind.Array)
+            {
+                return prop.EnumerateArray()
+                    .Where(k => k.ValueKind == JsonValueKind.String)
+                    .Select(k => k.GetString()!)
+                    .Where(k => !string.IsNullOrEmpty(k))
+                    .ToList();
+            }
+            return new List<string>();
+        }
+
         private string? GetJsonStringOrNull(JsonElement element, string propertyName)
         {
             if (element.TryGetProperty(propertyName, out var prop))
@@ -9,6 +9,7 @@ namespace TutorHubBD.Web.Services
         Task<List<TuitionOffer>> SearchOffersAsync(string city, string medium, string studentClass);
         Task CreateOfferAsync(TuitionOffer offer);
         Task DeleteOfferAsync(int id);
+        Task NotifyOfferStatusChangedAsync(TuitionOffer offer);
         Task<TuitionOffer?> GetOfferByIdAsync(int id);
     }
 }
@@ -1,6 +1,8 @@
 using Microsoft.EntityFrameworkCore;
 using System.Collections.Generic;
 using System.Linq;
+using System.Text;
+using System.Text.Json;
 using System.Threading.Tasks;
 using TutorHubBD.Web.Data;
 using TutorHubBD.Web.Models;
@@ -10,10 +12,20 @@ namespace TutorHubBD.Web.Services
     public class TuitionOfferService : ITuitionOfferService
     {
         private readonly ApplicationDbContext _context;
+        private readonly IConfiguration _configuration;
+        private readonly ILogger<TuitionOfferService> _logger;
+        private readonly HttpClient _aiServiceClient;
 
-        public TuitionOfferService(ApplicationDbContext context)
+        public TuitionOfferService(
+            ApplicationDbContext context,
+            IConfiguration configuration,
+            ILogger<TuitionOfferService> logger,
+            IHttpClientFactory httpClientFactory)
         {
             _context = context;
+            _configuration = configuration;
+            _logger = logger;
+            _aiServiceClient = httpClientFactory.CreateClient("AiService");
         }
 
         public async Task<List<TuitionOffer>> SearchOffersAsync(string city, string medium, string studentClass)
@@ -42,6 +54,63 @@ namespace TutorHubBD.Web.Services
         {
             _context.Add(offer);
             await _context.SaveChangesAsync();
+
+            await NotifyAiServiceAsync(offer);
+        }
+
+        // Keeps the AI service's salary estimates and job index current
+        private Task NotifyAiServiceAsync(TuitionOffer offer)
+        {
+            var jsonContent = JsonSerializer.Serialize(new
+            {
+                offer.Id,
+                offer.Title,
+                offer.Description,
+                offer.Salary,
+                offer.City,
+                offer.Location,
+                offer.Medium,
+                offer.StudentClass,
+                offer.Subject,
+                offer.DaysPerWeek,
+                offer.CreatedAt,
+                offer.Status
+            });
+            var content = new StringContent(jsonContent, Encoding.UTF8, "application/json");
+            return SendToAiServiceAsync(HttpMethod.Post, "offers", content, offer.Id);
+        }
+
+        // Filled or closed offers leave the AI service's job index
+        public Task NotifyOfferStatusChangedAsync(TuitionOffer offer)
+        {
+            var jsonContent = JsonSerializer.Serialize(new { offer.Status });
+            var content = new StringContent(jsonContent, Encoding.UTF8, "application/json");
+            return SendToAiServiceAsync(HttpMethod.Patch, $"offers/{offer.Id}", content, offer.Id);
+        }
+
+        // Failures are logged and ignored: managing jobs must never depend on the AI service.
+        // The shared client allows 30 s for extraction calls; notifications get a much
+        // shorter budget so a slow AI service can't hold up posting or hiring.
+        private async Task SendToAiServiceAsync(HttpMethod method, string path, HttpContent? content, int offerId)
+        {
+            var baseUrl = _configuration["AiService:BaseUrl"];
+            if (string.IsNullOrEmpty(baseUrl))
+                return;
+
+            try
+            {
+                using var timeout = new CancellationTokenSource(TimeSpan.FromSeconds(
+                    _configuration.GetValue("AiService:NotifyTimeoutSeconds", 2)));
+                using var request = new HttpRequestMessage(method, $"{baseUrl.TrimEnd('/')}/{path}") { Content = content };
+                using var response = await _aiServiceClient.SendAsync(request, timeout.Token);
+
+                if (!response.IsSuccessStatusCode)
+                    _logger.LogWarning($"AI service rejected {method} {path} for offer {offerId}: {response.StatusCode}");
+            }
+            catch (Exception ex)
+            {
+                _logger.LogWarning(ex, "Error notifying AI service about offer {OfferId}.", offerId);
+            }
         }
 
         public async Task DeleteOfferAsync(int id)
@@ -51,6 +120,8 @@ namespace TutorHubBD.Web.Services
             {
                 _context.TuitionOffers.Remove(offer);
                 await _context.SaveChangesAsync();
+
+                await SendToAiServiceAsync(HttpMethod.Delete, $"offers/{id}", null, id);
             }
         }
 
@@ -132,6 +132,7 @@ namespace TutorHubBD.Web.Tests
                 var result = await controller.ConfirmHiring(1, 10);
 
                 mockCommissionService.Verify(s => s.CreateInvoiceAsync(1, 1000), Times.Once);
+                mockService.Verify(s => s.NotifyOfferStatusChangedAsync(It.Is<TuitionOffer>(o => o.Id == 1 && o.Status == JobStatus.Filled)), Times.Once);
                 
                 var job = await context.TuitionOffers.FindAsync(1);
                 Assert.Equal(JobStatus.Filled, job.Status);